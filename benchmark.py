@@ -0,0 +1,184 @@
+import argparse
+import gc
+import json
+import math
+import random
+import sys
+import time
+import tracemalloc
+from heft import HEFT, StandaloneHEFT
+from multi_schedulers import DAG, MinMax, FDWS_RANK_HYBRID
+from task_generator import generate_tasks
+
+BENCHMARKS = ["heft_rank", "heft_schedule", "MinMax", "fdws", "rank_hybd"]
+
+# (generator, size, cores, graphs, compact). Compact graphs are what generate_dags and
+# the experiments schedule, the dict case keeps the original Task graphs covered.
+QUICK_CASES = [
+    ("FFT", 4, 4, 8, True),
+    ("GE", 10, 4, 8, True),
+    ("GE", 20, 8, 8, True),
+    ("GE", 20, 8, 8, False),
+]
+FULL_CASES = QUICK_CASES + [
+    ("FFT", 5, 16, 32, True),
+    ("GE", 20, 16, 32, True),
+    ("GE", 40, 8, 16, True),
+    ("GE", 40, 32, 16, True),
+    ("GE", 60, 64, 8, True),
+]
+SEED = 0
+# Every timing sample loops a benchmark for at least this long, so millisecond runs
+# are not compared on timer noise
+MIN_SAMPLE_TIME = 0.1
+
+
+class BenchmarkCase:
+    """
+    Seeded inputs of one benchmark configuration, generated once for every algorithm
+    """
+
+    def __init__(
+        self, generator: str, size: int, cores: int, graphs: int, compact: bool, seed: int = SEED
+    ):
+        self.generator = generator
+        self.size = size
+        self.cores = cores
+        self.graphs = graphs
+        self.compact = compact
+        random.seed(seed)
+        if compact:
+            self.task_graphs = generate_tasks.instances(generator, size, graphs)
+        else:
+            build = generate_tasks.GE if generator == "GE" else generate_tasks.FFT
+            self.task_graphs = [build(size) for _ in range(graphs)]
+        generate_tasks.populate_costs_batch(self.task_graphs, cores, seed)
+        self.dags = {i: DAG(i, graph, cores) for i, graph in enumerate(self.task_graphs)}
+        self.task_count = sum(len(graph) for graph in self.task_graphs)
+
+    def name(self) -> str:
+        name = f"{self.generator}-{self.size}/cores={self.cores}/graphs={self.graphs}"
+        return name if self.compact else f"{name}/dict"
+
+    def run(self, benchmark: str):
+        if benchmark == "heft_rank":
+            for graph in self.task_graphs:
+                HEFT.rank(graph)
+        elif benchmark == "heft_schedule":
+            for graph in self.task_graphs:
+                HEFT.schedule(graph, self.cores)
+        elif benchmark == "MinMax":
+            # DAG construction cached the standalone schedules, MinMax has to compute them
+            StandaloneHEFT.clear()
+            MinMax.schedule(self.dags, self.cores)
+        elif benchmark == "fdws":
+            FDWS_RANK_HYBRID.schedule(self.dags, self.cores, True)
+        elif benchmark == "rank_hybd":
+            FDWS_RANK_HYBRID.schedule(self.dags, self.cores, False)
+        else:
+            raise ValueError(f"Benchmark should be one of : {' - '.join(BENCHMARKS)}")
+
+
+def measure(case: BenchmarkCase, benchmark: str, repeat: int) -> dict:
+    """
+    Best wall time per run over repeat samples, then one more run under tracemalloc for
+    the peak. Each sample loops as many runs as the first one needs to last
+    MIN_SAMPLE_TIME.
+    """
+    gc.collect()
+    start = time.perf_counter()
+    case.run(benchmark)
+    loops = max(1, math.ceil(MIN_SAMPLE_TIME / max(time.perf_counter() - start, 1e-9)))
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        for _ in range(loops):
+            case.run(benchmark)
+        times.append((time.perf_counter() - start) / loops)
+    gc.collect()
+    tracemalloc.start()
+    case.run(benchmark)
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    wall_time = min(times)
+    return {
+        "case": case.name(),
+        "benchmark": benchmark,
+        "tasks": case.task_count,
+        "wall_time": wall_time,
+        "loops": loops,
+        "peak_memory": peak_memory,
+        "tasks_per_second": case.task_count / wall_time if wall_time > 0 else float("inf"),
+    }
+
+
+def run_benchmarks(
+    cases: list[tuple[str, int, int, int, bool]],
+    benchmarks: list[str] = BENCHMARKS,
+    repeat: int = 3,
+    verbose: bool = False,
+) -> list[dict]:
+    results: list[dict] = []
+    for generator, size, cores, graphs, compact in cases:
+        case = BenchmarkCase(generator, size, cores, graphs, compact)
+        for benchmark in benchmarks:
+            results.append(measure(case, benchmark, repeat))
+            if verbose:
+                print(format_result(results[-1]))
+        StandaloneHEFT.clear()
+    return results
+
+
+def format_result(result: dict) -> str:
+    return (
+        f"{result['case']:<32} {result['benchmark']:<14} "
+        f"{result['wall_time'] * 1000:>10.2f} ms {result['peak_memory'] / 1024:>10.0f} KiB "
+        f"{result['tasks_per_second']:>12.0f} tasks/s"
+    )
+
+
+def find_regressions(
+    results: list[dict], baseline: list[dict], threshold: float
+) -> list[str]:
+    """
+    Describes every result whose wall time or peak memory grew past threshold times
+    its baseline. Results without a baseline are ignored.
+    """
+    baseline_by_key = {(b["case"], b["benchmark"]): b for b in baseline}
+    regressions: list[str] = []
+    for result in results:
+        base = baseline_by_key.get((result["case"], result["benchmark"]))
+        if base is None:
+            continue
+        for metric in ["wall_time", "peak_memory"]:
+            if base[metric] > 0 and result[metric] > base[metric] * threshold:
+                regressions.append(
+                    f"{result['case']} {result['benchmark']}: {metric} "
+                    f"{result[metric]:.4g} > {threshold} x {base[metric]:.4g}"
+                )
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Times the schedulers on seeded inputs")
+    parser.add_argument("--full", action="store_true", help="also run the large cases")
+    parser.add_argument("--benchmarks", nargs="+", default=BENCHMARKS, choices=BENCHMARKS)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--save", default=None, help="write the results as a JSON baseline")
+    parser.add_argument("--compare", default=None, help="JSON baseline to check against")
+    parser.add_argument("--threshold", type=float, default=1.5)
+    args = parser.parse_args()
+    results = run_benchmarks(
+        FULL_CASES if args.full else QUICK_CASES, args.benchmarks, args.repeat, verbose=True
+    )
+    if args.save is not None:
+        with open(args.save, "w") as file:
+            json.dump(results, file, indent=2)
+    if args.compare is not None:
+        with open(args.compare) as file:
+            regressions = find_regressions(results, json.load(file), args.threshold)
+        for regression in regressions:
+            print("REGRESSION", regression)
+        if len(regressions) != 0:
+            sys.exit(1)
@@ -0,0 +1,383 @@
+import random
+import sys
+import numpy as np
+from heft import HEFT, CoreTimeline, ProcessorTimelines, ScheduledTask
+from multi_schedulers import DAG
+from repair import CoreLoss, ScheduleRepair, TaskOverrun
+from scheduler import ALGORITHMS, generate_dags, run_algorithm
+from streaming import POLICIES, StreamingScheduler, stream
+from task_generator import CompactGraph, Task, generate_tasks
+import metrics
+import simulation
+
+# Randomized self checks of what the schedulers promise, run as
+# python checks.py [rounds]. A failing check raises AssertionError naming its case.
+
+
+def random_dags(seed: int) -> tuple[dict, int]:
+    """
+    A small random multi DAG workload and its core count
+    """
+    rng = random.Random(seed)
+    method = rng.choice(["GE", "FFT"])
+    size = rng.randint(4, 9) if method == "GE" else rng.choice([4, 8])
+    cpus = rng.randint(2, 6)
+    return generate_dags(method, size, cpus, rng.randint(2, 6), seed), cpus
+
+
+def assert_valid(
+    scheduled_tasks: dict[int, dict[int, ScheduledTask]],
+    dags: dict,
+    cpus: int,
+    case: str,
+    overruns: dict[tuple[int, int], int] | None = None,
+):
+    """
+    Every task of every DAG is scheduled after its release and its parents' data, takes
+    its computation time (plus its overrun, keyed by (dag_id, task_id)) and never
+    overlaps another task on its core
+    """
+    overruns = {} if overruns is None else overruns
+    intervals_by_core: list[list[tuple[int, int]]] = [[] for _ in range(cpus)]
+    for dag_id, dag in dags.items():
+        schedule = scheduled_tasks[dag_id]
+        assert set(schedule) == set(dag.tasks), f"{case}: DAG {dag_id} tasks"
+        for task_id, scheduled_task in schedule.items():
+            task = dag.tasks[task_id]
+            cpu_id = scheduled_task.ran_cpu_id
+            assert scheduled_task.start_time >= dag.release_time, f"{case}: {task_id} release"
+            assert (
+                scheduled_task.computation_finish_time - scheduled_task.start_time
+                == task.computation_times[cpu_id] + overruns.get((dag_id, task_id), 0)
+            ), f"{case}: {task_id} duration"
+            for parent_id in task.fathers:
+                parent = schedule[parent_id]
+                assert (
+                    scheduled_task.start_time
+                    >= parent.computation_finish_time
+                    + dag.tasks[parent_id].communication_cost[task_id][parent.ran_cpu_id][cpu_id]
+                ), f"{case}: {task_id} starts before parent {parent_id}"
+            intervals_by_core[cpu_id].append(
+                (scheduled_task.start_time, scheduled_task.computation_finish_time)
+            )
+    for cpu_id, intervals in enumerate(intervals_by_core):
+        intervals.sort()
+        for before, after in zip(intervals, intervals[1:]):
+            assert before[1] < after[0], f"{case}: core {cpu_id} overlaps {before} {after}"
+
+
+def unit_step_start(intervals: list[tuple[int, int]], ready_time: int, cost: int) -> int:
+    """
+    The original gap search: step one time unit at a time until nothing overlaps
+    """
+    start_time = ready_time
+    while HEFT.is_interval_occupied_in_time(intervals, (start_time, start_time + cost)):
+        start_time += 1
+    return start_time
+
+
+def unit_step_heft(tasks: dict[int, Task], cpus: int) -> dict[int, ScheduledTask]:
+    """
+    The original HEFT.schedule, every core searched with unit_step_start
+    """
+    scheduled_tasks: dict[int, ScheduledTask] = {}
+    for _, task in HEFT.rank(tasks):
+        finish_times = []
+        start_times = []
+        for cpu_id in range(cpus):
+            ready_time = max(
+                (
+                    scheduled_tasks[parent_id].computation_finish_time
+                    + tasks[parent_id].communication_cost[task.id][
+                        scheduled_tasks[parent_id].ran_cpu_id
+                    ][cpu_id]
+                    for parent_id in task.fathers
+                ),
+                default=0,
+            )
+            intervals = [
+                (scheduled_task.start_time, scheduled_task.computation_finish_time)
+                for scheduled_task in scheduled_tasks.values()
+                if scheduled_task.ran_cpu_id == cpu_id
+            ]
+            start_times.append(
+                unit_step_start(intervals, ready_time, task.computation_times[cpu_id])
+            )
+            finish_times.append(start_times[-1] + task.computation_times[cpu_id])
+        best_cpu_id = finish_times.index(min(finish_times))
+        scheduled_tasks[task.id] = ScheduledTask(task, best_cpu_id, start_times[best_cpu_id])
+    return scheduled_tasks
+
+
+def random_intervals(rng: random.Random, count: int) -> list[tuple[int, int]]:
+    """
+    count disjoint closed intervals with random lengths and gaps, in random order
+    """
+    intervals = []
+    time = rng.randint(0, 20)
+    for _ in range(count):
+        length = rng.randint(0, 15)
+        intervals.append((time, time + length))
+        time += length + 1 + rng.choice([0, 0, rng.randint(0, 30)])
+    rng.shuffle(intervals)
+    return intervals
+
+
+def check_gap_search(seed: int):
+    """
+    CoreTimeline.earliest_start finds the same start as the unit step search
+    """
+    rng = random.Random(seed)
+    intervals = random_intervals(rng, rng.randint(0, 20))
+    timeline = CoreTimeline()
+    for start_time, finish_time in intervals:
+        timeline.add(start_time, finish_time)
+    end = max((finish_time for _, finish_time in intervals), default=0)
+    for _ in range(50):
+        ready_time, cost = rng.randint(0, end + 5), rng.randint(0, 40)
+        assert timeline.earliest_start(ready_time, cost) == unit_step_start(
+            intervals, ready_time, cost
+        ), f"seed {seed}: ready {ready_time} cost {cost}"
+
+
+def check_heft_schedule(seed: int):
+    """
+    HEFT.schedule places every task like the original unit step HEFT, on dict and
+    compact graphs
+    """
+    rng = random.Random(seed)
+    method = rng.choice(["GE", "FFT"])
+    size = rng.randint(3, 9) if method == "GE" else rng.choice([4, 8])
+    cpus = rng.randint(2, 6)
+    tasks = generate_tasks.GE(size) if method == "GE" else generate_tasks.FFT(size)
+    generate_tasks.populate_costs(tasks, cpus, seed)
+    expected = repr(unit_step_heft(tasks, cpus))
+    for graph in [tasks, CompactGraph.from_tasks(tasks)]:
+        assert repr(HEFT.schedule(graph, cpus)) == expected, f"seed {seed}: {type(graph)}"
+
+
+def check_chunked_timeline(seed: int):
+    """
+    A timeline split in many chunks keeps its intervals through adds, removes and
+    prunes, and still finds the unit step start
+    """
+    rng = random.Random(seed)
+    intervals = random_intervals(rng, rng.randint(3, 8) * CoreTimeline.CHUNK_SIZE)
+    timeline = CoreTimeline()
+    for start_time, finish_time in intervals:
+        timeline.add(start_time, finish_time)
+    for start_time, finish_time in rng.sample(intervals, len(intervals) // 4):
+        timeline.remove(start_time, finish_time)
+        intervals.remove((start_time, finish_time))
+    intervals.sort()
+    end = intervals[-1][1]
+    assert list(timeline.intervals_after(0)) == intervals, f"seed {seed}: intervals"
+    before = rng.randint(0, end)
+    timeline.prune(before)
+    assert list(timeline.intervals_after(before)) == [
+        interval for interval in intervals if interval[1] >= before
+    ], f"seed {seed}: pruned before {before}"
+    for _ in range(50):
+        # Pruned intervals finish before any of these ready times
+        ready_time, cost = rng.randint(before, end + 5), rng.randint(0, 40)
+        assert timeline.earliest_start(ready_time, cost) == unit_step_start(
+            intervals, ready_time, cost
+        ), f"seed {seed}: ready {ready_time} cost {cost}"
+
+
+def check_multi_dag_schedules(seed: int):
+    """
+    Every multi DAG scheduler gives a valid schedule, and the shared timelines hold
+    exactly its intervals and latest finish time
+    """
+    dags, cpus = random_dags(seed)
+    for algorithm in ALGORITHMS:
+        scheduled_tasks = run_algorithm(algorithm, dags, cpus)
+        case = f"seed {seed} {algorithm}"
+        assert_valid(scheduled_tasks, dags, cpus, case)
+        timelines = ProcessorTimelines(cpus)
+        for schedule in scheduled_tasks.values():
+            for scheduled_task in schedule.values():
+                timelines.place(scheduled_task)
+        assert timelines.latest_finish_time == max(
+            scheduled_task.computation_finish_time
+            for schedule in scheduled_tasks.values()
+            for scheduled_task in schedule.values()
+        ), f"{case}: latest finish time"
+        for cpu_id, core in enumerate(timelines.cores):
+            assert list(core.intervals_after(0)) == sorted(
+                (scheduled_task.start_time, scheduled_task.computation_finish_time)
+                for schedule in scheduled_tasks.values()
+                for scheduled_task in schedule.values()
+                if scheduled_task.ran_cpu_id == cpu_id
+            ), f"{case}: core {cpu_id} intervals"
+
+
+def check_streaming_interleaving(seed: int):
+    """
+    A DAG submitted late, after a finished DAG was dropped and a far future DAG is
+    waiting, is still placed around every interval which is live
+    """
+    cpus = random.Random(seed).randint(2, 6)
+    graphs = [dag.tasks for dag in generate_dags("GE", 6, cpus, 3, seed).values()]
+    first, far, late = (
+        DAG(i, graph, cpus, release_time)
+        for i, (graph, release_time) in enumerate(zip(graphs, [0, 50000, 0]))
+    )
+    dags = {dag.id: dag for dag in (first, far, late)}
+    for policy in POLICIES:
+        scheduler = StreamingScheduler(cpus, policy)
+        scheduler.submit(first)
+        placements = scheduler.advance(float("inf"))
+        scheduler.completed(max(task.computation_finish_time for _, task in placements))
+        scheduler.submit(far)
+        placements += scheduler.advance(scheduler.current_time)
+        scheduler.submit(late)
+        placements += scheduler.advance(float("inf"))
+        scheduled_tasks: dict[int, dict[int, ScheduledTask]] = {dag_id: {} for dag_id in dags}
+        for dag_id, scheduled_task in placements:
+            scheduled_tasks[dag_id][scheduled_task.task_id] = scheduled_task
+        assert_valid(scheduled_tasks, dags, cpus, f"seed {seed} {policy}")
+
+
+def check_stream_drops_finished(seed: int):
+    """
+    A full stream completes every placed task once and leaves the scheduler empty
+    """
+    dags, cpus = random_dags(seed)
+    arrivals = sorted(dags.values(), key=lambda dag: (dag.release_time, dag.id))
+    for policy in POLICIES:
+        scheduler = StreamingScheduler(cpus, policy)
+        placed, finished = [], []
+        for placements, completions in stream(scheduler, arrivals):
+            placed += placements
+            finished += completions
+        case = f"seed {seed} {policy}"
+        assert len(placed) == sum(len(dag.tasks) for dag in dags.values()), f"{case}: placed"
+        assert sorted(id(task) for _, task in finished) == sorted(
+            id(task) for _, task in placed
+        ), f"{case}: completions"
+        assert scheduler.in_flight() == 0 and len(scheduler.running_tasks) == 0, case
+        assert len(scheduler.arrivals) == len(scheduler.scheduled_tasks) == 0, case
+
+
+def check_schedule_repair(seed: int):
+    """
+    Random overruns and core losses keep the schedule valid: only the returned tasks
+    move, they start after the event, and nothing runs on a lost core afterwards
+    """
+    rng = random.Random(seed)
+    dags, cpus = random_dags(seed)
+    algorithm = rng.choice(ALGORITHMS)
+    repairer = ScheduleRepair(run_algorithm(algorithm, dags, cpus), dags, cpus)
+    overruns: dict[tuple[int, int], int] = {}
+    clock = 0
+    for step in range(6):
+        case = f"seed {seed} {algorithm} step {step}"
+        scheduled = [
+            (dag_id, scheduled_task)
+            for dag_id, schedule in repairer.scheduled_tasks.items()
+            for scheduled_task in schedule.values()
+        ]
+        before = {
+            dag_id: dict(schedule) for dag_id, schedule in repairer.scheduled_tasks.items()
+        }
+        running = [
+            (dag_id, scheduled_task)
+            for dag_id, scheduled_task in scheduled
+            if scheduled_task.ran_cpu_id not in repairer.lost_cores
+            and scheduled_task.computation_finish_time >= clock
+        ]
+        live_cores = [cpu_id for cpu_id in range(cpus) if cpu_id not in repairer.lost_cores]
+        lost_core = None
+        if rng.random() < 0.6 and len(running) != 0:
+            dag_id, scheduled_task = rng.choice(running)
+            # Sometimes only reported after the planned finish
+            now = rng.randint(
+                max(clock, scheduled_task.start_time),
+                max(clock, scheduled_task.computation_finish_time) + rng.choice([0, 100]),
+            )
+            delta = rng.randint(1, 200)
+            try:
+                moved = repairer.repair(now, TaskOverrun(dag_id, scheduled_task.task_id, delta))
+            except ValueError:
+                # Only late reports are rejected, and without touching the schedule
+                assert now > scheduled_task.computation_finish_time, f"{case}: rejected"
+                assert repairer.scheduled_tasks == before, f"{case}: changed when rejected"
+                continue
+            key = (dag_id, scheduled_task.task_id)
+            overruns[key] = overruns.get(key, 0) + delta
+            # The overrun task keeps its start, only its finish changes
+            before[dag_id][scheduled_task.task_id] = repairer.scheduled_tasks[dag_id][
+                scheduled_task.task_id
+            ]
+        elif len(live_cores) > 1:
+            now = rng.randint(
+                clock,
+                max(clock, max(task.computation_finish_time for _, task in scheduled)),
+            )
+            lost_core = rng.choice(live_cores)
+            moved = repairer.repair(now, CoreLoss(lost_core))
+        else:
+            continue
+        for dag_id, schedule in moved.items():
+            for task_id in schedule:
+                # A moved task starts over, without its overrun
+                overruns.pop((dag_id, task_id), None)
+        assert_valid(repairer.scheduled_tasks, dags, cpus, case, overruns)
+        for dag_id, schedule in repairer.scheduled_tasks.items():
+            for task_id, scheduled_task in schedule.items():
+                if scheduled_task.ran_cpu_id in repairer.lost_cores:
+                    assert (
+                        scheduled_task.computation_finish_time <= now
+                    ), f"{case}: {task_id} runs on lost core {scheduled_task.ran_cpu_id}"
+                unmoved = before[dag_id][task_id]
+                if task_id in moved.get(dag_id, {}):
+                    assert scheduled_task.start_time > now, f"{case}: {task_id} moved early"
+                    # Only a lost core restarts a running task, nothing finished moves
+                    assert (
+                        unmoved.computation_finish_time > now
+                        if unmoved.ran_cpu_id == lost_core
+                        else unmoved.start_time > now
+                    ), f"{case}: {task_id} had started and moved"
+                    continue
+                assert (unmoved.ran_cpu_id, unmoved.start_time) == (
+                    scheduled_task.ran_cpu_id,
+                    scheduled_task.start_time,
+                ), f"{case}: {task_id} moved without being returned"
+        clock = now
+
+
+def check_zero_noise_replay(seed: int):
+    """
+    Replaying a schedule without noise gives back its makespan and unfairness
+    """
+    dags, cpus = random_dags(seed)
+    graphs_by_dag = {dag_id: dag.tasks for dag_id, dag in dags.items()}
+    for algorithm in ALGORITHMS:
+        scheduled_tasks = run_algorithm(algorithm, dags, cpus)
+        static = metrics.evaluate(scheduled_tasks, graphs_by_dag, cpus)
+        result = simulation.simulate(scheduled_tasks, dags, cpus, samples=2, noise=0, seed=seed)
+        case = f"seed {seed} {algorithm}"
+        assert np.all(result.makespans == static.makespan), f"{case}: makespan"
+        assert np.allclose(result.unfairnesses, static.unfairness), f"{case}: unfairness"
+
+
+CHECKS = [
+    check_gap_search,
+    check_heft_schedule,
+    check_chunked_timeline,
+    check_multi_dag_schedules,
+    check_streaming_interleaving,
+    check_stream_drops_finished,
+    check_schedule_repair,
+    check_zero_noise_replay,
+]
+
+
+if __name__ == "__main__":
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    for check in CHECKS:
+        for seed in range(rounds):
+            check(seed)
+        print(f"{check.__name__}: {rounds} rounds ok")
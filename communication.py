@@ -0,0 +1,120 @@
+import numpy as np
+
+# Communication cost models of a CompactGraph. Schedulers only go through matrix, rows
+# and means, so any model answering those can be plugged in. Costs are whole time
+# steps like everything else.
+
+
+class DenseCommunication:
+    """
+    The original model: a random cpus x cpus cost matrix for every edge, stored as an
+    edges x cpus x cpus array. Memory grows with edges x cpus^2.
+    """
+
+    def __init__(self, costs: np.ndarray):
+        self.costs = costs
+
+    def __len__(self) -> int:
+        return len(self.costs)
+
+    def matrix(self, edge: int) -> np.ndarray:
+        return self.costs[edge]
+
+    def rows(self, edges: np.ndarray, source_cpus: list[int]) -> np.ndarray:
+        """
+        Cost of each edge from its source core to every core, edges x cpus
+        """
+        return self.costs[edges, source_cpus]
+
+    def means(self) -> np.ndarray:
+        # Mean over the cores pairs which actually communicate (non zero costs)
+        return self.costs.sum(axis=(1, 2)) / (self.costs != 0).sum(axis=(1, 2))
+
+    def restricted(self, cores: range) -> "DenseCommunication":
+        return DenseCommunication(
+            self.costs[:, cores.start : cores.stop, cores.start : cores.stop]
+        )
+
+    def dense(self) -> np.ndarray:
+        return self.costs
+
+    def arrays(self) -> list[np.ndarray]:
+        return [self.costs]
+
+    def copy(self) -> "DenseCommunication":
+        return DenseCommunication(self.costs.copy())
+
+
+class VolumeCommunication:
+    """
+    Data volume of every edge times a cpus x cpus link cost matrix shared by every edge,
+    so memory grows with edges + cpus^2
+    """
+
+    def __init__(self, volumes: np.ndarray, links: np.ndarray):
+        self.volumes = volumes
+        self.links = np.asarray(links, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self.volumes)
+
+    def matrix(self, edge: int) -> np.ndarray:
+        return self.volumes[edge] * self.links
+
+    def rows(self, edges: np.ndarray, source_cpus: list[int]) -> np.ndarray:
+        return self.volumes[edges, None] * self.links[source_cpus]
+
+    def means(self) -> np.ndarray:
+        # Same as the dense mean, every edge shares the same non zero pairs
+        linked = np.count_nonzero(self.links)
+        if linked == 0:
+            return np.zeros(len(self.volumes))
+        return self.volumes * (self.links.sum() / linked)
+
+    def restricted(self, cores: range) -> "VolumeCommunication":
+        return VolumeCommunication(
+            self.volumes, self.links[cores.start : cores.stop, cores.start : cores.stop]
+        )
+
+    def dense(self) -> np.ndarray:
+        # Only for code which needs the old layout, it costs edges x cpus^2 again
+        return self.volumes[:, None, None] * self.links
+
+    def arrays(self) -> list[np.ndarray]:
+        return [self.volumes, self.links]
+
+    def copy(self) -> "VolumeCommunication":
+        return VolumeCommunication(self.volumes.copy(), self.links.copy())
+
+
+def uniform_links(cpus: int, cost: int = 1) -> np.ndarray:
+    """
+    Every pair of distinct cores costs the same, a task talking to itself costs nothing
+    """
+    links = np.full((cpus, cpus), cost, dtype=np.int64)
+    np.fill_diagonal(links, 0)
+    return links
+
+
+def topology_links(
+    cpus: int,
+    cores_per_socket: int,
+    sockets_per_node: int = 1,
+    socket_cost: int = 1,
+    node_cost: int = 2,
+    network_cost: int = 4,
+) -> np.ndarray:
+    """
+    Link costs of cores numbered socket by socket and node by node: socket_cost inside a
+    socket, node_cost between sockets of a node and network_cost between nodes
+    """
+    cores = np.arange(cpus)
+    sockets = cores // cores_per_socket
+    nodes = sockets // sockets_per_node
+    links = np.where(
+        nodes[:, None] != nodes[None, :],
+        network_cost,
+        np.where(sockets[:, None] != sockets[None, :], node_cost, socket_cost),
+    ).astype(np.int64)
+    np.fill_diagonal(links, 0)
+    return links
@@ -0,0 +1,273 @@
+import argparse
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from scheduler import ALGORITHMS, generate_dags, run_algorithm
+from heft import StandaloneHEFT
+import metrics
+from result_store import ResultStore
+from instrumentation import ENABLE_VARIABLE, STATS, profiled
+
+METRICS = ["unfairness", "makespan"]
+
+
+class ExperimentConfig:
+    """
+    One point of a sweep. Every algorithm of the point runs on the same generated DAGs.
+    """
+
+    def __init__(
+        self,
+        generator: str,
+        tasks: int,
+        cores: int,
+        graphs: int,
+        algorithms: list[str],
+        seed: int,
+    ):
+        self.generator = generator
+        self.tasks = tasks
+        self.cores = cores
+        self.graphs = graphs
+        self.algorithms = algorithms
+        self.seed = seed
+
+    def key(self) -> tuple[str, int, int, int, int]:
+        return (self.generator, self.tasks, self.cores, self.graphs, self.seed)
+
+    def __repr__(self) -> str:
+        return str(
+            {
+                "generator": self.generator,
+                "tasks": self.tasks,
+                "cores": self.cores,
+                "graphs": self.graphs,
+                "algorithms": self.algorithms,
+                "seed": self.seed,
+            }
+        )
+
+
+def parameter_grid(
+    generators: list[str],
+    sizes: list[int],
+    cores: list[int],
+    graphs: list[int],
+    algorithms: list[str] = ALGORITHMS,
+    seeds: list[int] = [0],
+) -> list[ExperimentConfig]:
+    return [
+        ExperimentConfig(generator, size, core, graph, algorithms, seed)
+        for generator, size, core, graph, seed in itertools.product(
+            generators, sizes, cores, graphs, seeds
+        )
+    ]
+
+
+def unique_configs(configs: list[ExperimentConfig]) -> list[ExperimentConfig]:
+    """
+    Drops configurations which appear more than once, e.g. where two sweeps cross
+    """
+    result: dict[tuple, ExperimentConfig] = {}
+    for config in configs:
+        if config.key() in result:
+            merged = result[config.key()].algorithms + config.algorithms
+            result[config.key()].algorithms = list(dict.fromkeys(merged))
+            continue
+        result[config.key()] = ExperimentConfig(
+            config.generator, config.tasks, config.cores, config.graphs,
+            list(config.algorithms), config.seed,
+        )
+    return list(result.values())
+
+
+def run_experiment(config: ExperimentConfig) -> list[dict]:
+    """
+    Runs every algorithm of the configuration and returns one record per algorithm.
+    With instrumentation on, each record also carries the stats of the whole configuration.
+    """
+    STATS.reset()
+    dags = generate_dags(
+        config.generator, config.tasks, config.cores, config.graphs, config.seed
+    )
+    graphs_by_dag = {i: dag.tasks for i, dag in dags.items()}
+    records: list[dict] = []
+    for algorithm in config.algorithms:
+        schedule_metrics = metrics.evaluate(
+            run_algorithm(algorithm, dags, config.cores), graphs_by_dag, config.cores
+        )
+        dag_metrics = schedule_metrics.per_dag()
+        makespan = schedule_metrics.makespan
+        unfairness = schedule_metrics.unfairness
+        records.append(
+            {
+                "generator": config.generator,
+                "tasks": config.tasks,
+                "cores": config.cores,
+                "graphs": config.graphs,
+                "algorithm": algorithm,
+                "seed": config.seed,
+                "makespan": makespan,
+                "unfairness": unfairness,
+                "dags": dag_metrics,
+            }
+        )
+    # Standalone schedules are only shared inside one experiment
+    StandaloneHEFT.clear()
+    if STATS.enabled:
+        for record in records:
+            record["stats"] = STATS.snapshot()
+    return records
+
+
+def record_key(record: dict) -> tuple[str, int, int, int, str, int]:
+    return (
+        record["generator"],
+        record["tasks"],
+        record["cores"],
+        record["graphs"],
+        record["algorithm"],
+        record["seed"],
+    )
+
+
+def run_sweep(
+    configs: list[ExperimentConfig],
+    workers: int | None = None,
+    store: ResultStore | None = None,
+) -> list[dict]:
+    """
+    Runs every configuration once, spread over a process pool.
+    With a store, (configuration, algorithm) pairs already stored for this code version
+    are skipped and every finished configuration is saved right away, so an interrupted
+    sweep resumes where it stopped.
+    """
+    configs = unique_configs(configs)
+    wanted_keys = [
+        config.key()[:4] + (algorithm, config.seed)
+        for config in configs
+        for algorithm in config.algorithms
+    ]
+    pending_configs = configs
+    if store is not None:
+        done_keys = store.done_keys()
+        pending_configs = []
+        for config in configs:
+            missing = [
+                algorithm
+                for algorithm in config.algorithms
+                if config.key()[:4] + (algorithm, config.seed) not in done_keys
+            ]
+            if len(missing) != 0:
+                pending_configs.append(
+                    ExperimentConfig(
+                        config.generator, config.tasks, config.cores, config.graphs,
+                        missing, config.seed,
+                    )
+                )
+    records: list[dict] = []
+    if workers == 1:
+        for config in pending_configs:
+            records.extend(run_experiment(config))
+            if store is not None:
+                store.save(records[-len(config.algorithms) :])
+    else:
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+            futures = [executor.submit(run_experiment, config) for config in pending_configs]
+            for future in as_completed(futures):
+                records.extend(future.result())
+                if store is not None:
+                    store.save(future.result())
+    if store is not None:
+        # Records of this run come last so they win, the store does not keep their stats
+        records = store.load(with_dags=True) + records
+    by_key = {record_key(record): record for record in records}
+    return [by_key[key] for key in wanted_keys]
+
+
+def plot_records(
+    records: list[dict], x_axis: str, fixed: dict[str, int], file_prefix: str = ""
+) -> list[str]:
+    """
+    Draws one plot per task size and metric, with x_axis ("cores" or "graphs") on the
+    x axis and one line per algorithm. Only records matching fixed are used and
+    seeds are averaged. Returns the written file names.
+    """
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    records = [
+        record
+        for record in records
+        if all(record[name] == value for name, value in fixed.items())
+    ]
+    file_names: list[str] = []
+    for generator, task in sorted({(r["generator"], r["tasks"]) for r in records}):
+        task_records = [
+            r for r in records if r["generator"] == generator and r["tasks"] == task
+        ]
+        for metric in METRICS:
+            fig, ax = plt.subplots(1, 1)
+            for algorithm in dict.fromkeys(r["algorithm"] for r in task_records):
+                # x -> values over seeds
+                values: dict[int, list[float]] = {}
+                for r in task_records:
+                    if r["algorithm"] == algorithm:
+                        values.setdefault(r[x_axis], []).append(r[metric])
+                xs = sorted(values)
+                ax.plot(xs, [sum(values[x]) / len(values[x]) for x in xs], label=algorithm)
+            ax.set_xlabel(x_axis.capitalize())
+            ax.set_ylabel(metric)
+            ax.legend()
+            fig.tight_layout()
+            file_name = f"{file_prefix}{metric}_{x_axis}_task_{task}.png"
+            fig.savefig(file_name)
+            plt.close(fig)
+            file_names.append(file_name)
+    return file_names
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Runs a grid of multi DAG scheduling experiments")
+    parser.add_argument("--generators", nargs="+", default=["GE"], choices=["GE", "FFT"])
+    parser.add_argument("--sizes", nargs="+", type=int, default=[5, 10, 15])
+    parser.add_argument("--cores", nargs="+", type=int, default=[4, 8, 16, 32])
+    parser.add_argument("--graphs", nargs="+", type=int, default=[8])
+    parser.add_argument("--algorithms", nargs="+", default=ALGORITHMS, choices=ALGORITHMS)
+    parser.add_argument("--seeds", nargs="+", type=int, default=[0])
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--plot", choices=["cores", "graphs"], default=None)
+    parser.add_argument("--store", default=None, help="SQLite file to resume from and save to")
+    parser.add_argument("--stats", action="store_true", help="print phase timers and counters")
+    parser.add_argument(
+        "--profile", default=None, help="cProfile output file (profiles this process, use --workers 1)"
+    )
+    args = parser.parse_args()
+    if args.stats:
+        # Through the environment too, so pool workers pick it up whichever way they start
+        os.environ[ENABLE_VARIABLE] = "1"
+        STATS.enable()
+    store = ResultStore(args.store) if args.store is not None else None
+    with profiled(args.profile):
+        records = run_sweep(
+            parameter_grid(
+                args.generators, args.sizes, args.cores, args.graphs, args.algorithms, args.seeds
+            ),
+            args.workers,
+            store,
+        )
+    for record in records:
+        print({name: value for name, value in record.items() if name not in ("dags", "stats")})
+        if "stats" in record:
+            print(record["stats"])
+    if args.stats and any("stats" not in record for record in records):
+        print("Stats are not stored, records read back from the store have none")
+    if args.plot is not None:
+        other_axis = "graphs" if args.plot == "cores" else "cores"
+        values = {record[other_axis] for record in records}
+        if len(values) == 1:
+            plot_records(records, args.plot, {other_axis: values.pop()})
+        else:
+            print(f"Plotting needs a single value for {other_axis}")
@@ -1,17 +1,33 @@
 import sys
+import bisect
+import copy
+import hashlib
+from collections import OrderedDict
 from typing import Iterator
-from task_generator import Task, generate_tasks
+from task_generator import CompactGraph, Task, generate_tasks
+from instrumentation import STATS
+from communication import DenseCommunication
 from pprint import pprint
-import matplotlib.pyplot as plt
 import numpy as np
 
 class ScheduledTask:
-    def __init__(self, task: Task, cpu_id: int, start_time: int):
+    def __init__(
+        self, task: Task, cpu_id: int, start_time: int, computation_time: int | None = None
+    ):
         self.task_id = task.id
-        self.start_time = start_time
-        self.computation_finish_time = start_time + task.computation_times[cpu_id]
+        if computation_time is None:
+            computation_time = task.computation_times[cpu_id]
+        # Plain ints even when the costs come from the arrays of a CompactGraph
+        self.start_time = int(start_time)
+        self.computation_finish_time = int(start_time + computation_time)
         self.ran_cpu_id = cpu_id
 
+    def shifted(self, offset: int) -> "ScheduledTask":
+        shifted_task = copy.copy(self)
+        shifted_task.start_time += offset
+        shifted_task.computation_finish_time += offset
+        return shifted_task
+
     def __repr__(self) -> str:
         return str(
             {
@@ -23,15 +39,202 @@ class ScheduledTask:
         )
 
 
+class CoreTimeline:
+    """
+    Busy intervals of a single CPU core, kept sorted by start time.
+    Intervals are stored in chunks of sorted runs, each remembering its largest idle gap,
+    so a gap search can jump over whole chunks which are too packed for the task.
+    """
+
+    CHUNK_SIZE = 16
+
+    def __init__(self):
+        # Intervals never overlap on a core, so starts and ends are both sorted
+        self.chunk_starts: list[list[int]] = []
+        self.chunk_ends: list[list[int]] = []
+        # Largest gap between two neighbouring intervals of each chunk
+        self.chunk_gaps: list[int] = []
+        # Last finish time of each chunk, used to bisect for the right chunk
+        self.chunk_last_ends: list[int] = []
+
+    @staticmethod
+    def largest_gap(starts: list[int], ends: list[int]) -> int:
+        # A task of length d fits right after interval i only if the gap is bigger than d
+        return max(
+            (next_start - end - 1 for next_start, end in zip(starts[1:], ends)),
+            default=-1,
+        )
+
+    def add(self, start_time: int, finish_time: int):
+        if len(self.chunk_starts) == 0:
+            self.chunk_starts.append([start_time])
+            self.chunk_ends.append([finish_time])
+            self.chunk_gaps.append(-1)
+            self.chunk_last_ends.append(finish_time)
+            return
+        chunk = min(
+            bisect.bisect_left(self.chunk_last_ends, start_time),
+            len(self.chunk_starts) - 1,
+        )
+        starts, ends = self.chunk_starts[chunk], self.chunk_ends[chunk]
+        index = bisect.bisect_left(starts, start_time)
+        starts.insert(index, start_time)
+        ends.insert(index, finish_time)
+        self.chunk_last_ends[chunk] = ends[-1]
+        if len(starts) <= 2 * CoreTimeline.CHUNK_SIZE:
+            self.chunk_gaps[chunk] = CoreTimeline.largest_gap(starts, ends)
+            return
+        # Split the chunk in half so that rescanning a chunk stays cheap
+        half = len(starts) // 2
+        self.chunk_starts[chunk : chunk + 1] = [starts[:half], starts[half:]]
+        self.chunk_ends[chunk : chunk + 1] = [ends[:half], ends[half:]]
+        self.chunk_gaps[chunk : chunk + 1] = [
+            CoreTimeline.largest_gap(starts[:half], ends[:half]),
+            CoreTimeline.largest_gap(starts[half:], ends[half:]),
+        ]
+        self.chunk_last_ends[chunk : chunk + 1] = [ends[half - 1], ends[-1]]
+
+    def add_scheduled_task(self, scheduled_task: ScheduledTask):
+        self.add(scheduled_task.start_time, scheduled_task.computation_finish_time)
+
+    def remove(self, start_time: int, finish_time: int):
+        chunk = bisect.bisect_left(self.chunk_last_ends, finish_time)
+        starts, ends = self.chunk_starts[chunk], self.chunk_ends[chunk]
+        index = bisect.bisect_left(starts, start_time)
+        assert ends[index] == finish_time  # sanity check
+        del starts[index], ends[index]
+        if len(starts) == 0:
+            del self.chunk_starts[chunk], self.chunk_ends[chunk]
+            del self.chunk_gaps[chunk], self.chunk_last_ends[chunk]
+            return
+        self.chunk_gaps[chunk] = CoreTimeline.largest_gap(starts, ends)
+        self.chunk_last_ends[chunk] = ends[-1]
+
+    def intervals_after(self, time: int) -> Iterator[tuple[int, int]]:
+        """
+        (start, finish) of every interval finishing at or after the given time, in order
+        """
+        chunk = bisect.bisect_left(self.chunk_last_ends, time)
+        if chunk == len(self.chunk_starts):
+            return
+        index = bisect.bisect_left(self.chunk_ends[chunk], time)
+        for starts, ends in zip(self.chunk_starts[chunk:], self.chunk_ends[chunk:]):
+            yield from zip(starts[index:], ends[index:])
+            index = 0
+
+    def prune(self, before: int):
+        """
+        Forgets intervals finishing before the given time. Only safe when no task will
+        ever be searched for with a ready time earlier than that.
+        """
+        while len(self.chunk_last_ends) != 0 and self.chunk_last_ends[0] < before:
+            del self.chunk_starts[0], self.chunk_ends[0]
+            del self.chunk_gaps[0], self.chunk_last_ends[0]
+        if len(self.chunk_starts) == 0:
+            return
+        starts, ends = self.chunk_starts[0], self.chunk_ends[0]
+        index = bisect.bisect_left(ends, before)
+        if index != 0:
+            del starts[:index], ends[:index]
+            self.chunk_gaps[0] = CoreTimeline.largest_gap(starts, ends)
+
+    def earliest_start(self, fastest_start_time: int, computation_cost: int) -> int:
+        """
+        Finds the first time at or after fastest_start_time which fits computation_cost.
+        Intervals are closed just like HEFT.is_interval_occupied_in_time, so the task
+        can neither start at the end of another task nor end at the start of one.
+        """
+        candidate_start_time = fastest_start_time
+        # Every interval before this one finishes before we are even ready
+        chunk = bisect.bisect_left(self.chunk_last_ends, fastest_start_time)
+        if chunk == len(self.chunk_starts):
+            return candidate_start_time
+        index = bisect.bisect_left(self.chunk_ends[chunk], fastest_start_time)
+        while chunk < len(self.chunk_starts):
+            starts, ends = self.chunk_starts[chunk], self.chunk_ends[chunk]
+            if (
+                index == 0
+                and starts[0] <= candidate_start_time + computation_cost
+                and self.chunk_gaps[chunk] <= computation_cost
+            ):
+                # The task collides with the first interval and no gap of this chunk
+                # can hold it, so it can only go after the whole chunk
+                candidate_start_time = ends[-1] + 1
+            else:
+                while index < len(starts):
+                    if starts[index] > candidate_start_time + computation_cost:
+                        return candidate_start_time
+                    candidate_start_time = ends[index] + 1
+                    index += 1
+            chunk += 1
+            index = 0
+        return candidate_start_time
+
+
+class ProcessorTimelines:
+    """
+    Shared state of every core: their busy intervals and the latest finish time so far
+    """
+
+    def __init__(self, cpus: int):
+        self.cores = [CoreTimeline() for _ in range(cpus)]
+        self.latest_finish_time = 0
+
+    def earliest_start(
+        self, cpu_id: int, fastest_start_time: int, computation_cost: int
+    ) -> int:
+        return self.cores[cpu_id].earliest_start(fastest_start_time, computation_cost)
+
+    def earliest_starts(
+        self, fastest_start_times: list[int], computation_costs: list[int]
+    ) -> list[int]:
+        """
+        earliest_start of every core, cores which are idle after the ready time answer
+        without searching
+        """
+        if STATS.enabled:
+            STATS.count("gap_probes", len(self.cores))
+            STATS.count(
+                "gap_searches",
+                sum(
+                    len(core.chunk_last_ends) != 0 and core.chunk_last_ends[-1] >= ready_time
+                    for core, ready_time in zip(self.cores, fastest_start_times)
+                ),
+            )
+        return [
+            fastest_start_time
+            if len(core.chunk_last_ends) == 0 or core.chunk_last_ends[-1] < fastest_start_time
+            else core.earliest_start(fastest_start_time, computation_cost)
+            for core, fastest_start_time, computation_cost in zip(
+                self.cores, fastest_start_times, computation_costs
+            )
+        ]
+
+    def prune(self, before: int):
+        for core in self.cores:
+            core.prune(before)
+
+    def place(self, scheduled_task: ScheduledTask):
+        if STATS.enabled:
+            STATS.count("tasks_placed")
+        self.cores[scheduled_task.ran_cpu_id].add_scheduled_task(scheduled_task)
+        self.latest_finish_time = max(
+            self.latest_finish_time, scheduled_task.computation_finish_time
+        )
+
+    def remove(self, scheduled_task: ScheduledTask):
+        # latest_finish_time stays as it was, it is only an upper bound afterwards
+        self.cores[scheduled_task.ran_cpu_id].remove(
+            scheduled_task.start_time, scheduled_task.computation_finish_time
+        )
+
+
 class HEFT:
     @staticmethod
-    def rank(tasks: dict[int, Task]) -> list[tuple[float, Task]]:
+    @STATS.timed("rank")
+    def rank(tasks: dict[int, Task], verbose: bool = False) -> list[tuple[float, Task]]:
         # task-id -> rank
-        task_ranks: dict[int, float] = {}
-        for id in range(1, len(tasks) + 1):
-            if id in task_ranks:
-                continue
-            task_ranks[id] = HEFT.calculate_rank(tasks, task_ranks, id)
+        task_ranks = HEFT.upward_ranks(tasks, verbose)
         result: list[tuple[float, Task]] = []
         for id, rank in sorted(
             task_ranks.items(), key=lambda item: item[1], reverse=True
@@ -40,24 +243,108 @@ class HEFT:
         return result
 
     @staticmethod
-    def calculate_rank(
-        tasks: dict[int, Task], task_ranks: dict[int, float], wanted: int
-    ) -> float:
-        if wanted in task_ranks:
-            return task_ranks[wanted]
-        current_task = tasks[wanted]
-        if len(current_task.children) == 0:
-            return current_task.average_computation()
-        current_rank = current_task.average_computation() + max(
-            map(
-                lambda child_task_id: current_task.average_communication(child_task_id)
-                + HEFT.calculate_rank(tasks, task_ranks, child_task_id),
-                current_task.children,
+    def mean_costs(
+        tasks: dict[int, Task], task_ids: list[int]
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Returns the mean computation time of every task (in task_ids order), the start
+        offset of each task's outgoing edges and the mean communication cost of every
+        edge (in task.children order), so that ranking never touches the nested lists again
+        """
+        if isinstance(tasks, CompactGraph):
+            return tasks.mean_costs()
+        average_computations = np.array(
+            [tasks[id].computation_times for id in task_ids], dtype=float
+        ).mean(axis=1)
+        edge_offsets = np.zeros(len(task_ids) + 1, dtype=int)
+        edge_offsets[1:] = np.cumsum([len(tasks[id].children) for id in task_ids])
+        if edge_offsets[-1] == 0:
+            return average_computations, edge_offsets, np.zeros(0)
+        # Nested lists are the dense model, same as Task.average_communication for every edge
+        communication = DenseCommunication(
+            np.array(
+                [
+                    tasks[id].communication_cost[child_id]
+                    for id in task_ids
+                    for child_id in tasks[id].children
+                ]
             )
         )
-        task_ranks[wanted] = current_rank
-        print(f"{wanted} -> {current_rank}")
-        return current_rank
+        return average_computations, edge_offsets, communication.means()
+
+    @staticmethod
+    def ranking_order(tasks: dict[int, Task]) -> list[int]:
+        """
+        Order in which upward_ranks ranks the tasks, children before their parents.
+        It is an iterative depth first search from every task in id order, so the ranks
+        are filled in the same order as the old recursive version and ties sort the same
+        way. Exit tasks come when the search reaches them as roots.
+        The order only depends on the structure, so it is kept on the topology of
+        CompactGraphs and computed once for all the graphs sharing it.
+        """
+        if isinstance(tasks, CompactGraph) and tasks.topology.rank_order is not None:
+            return tasks.topology.rank_order
+        order: list[int] = []
+        ranked: set[int] = set()
+        for root_id in range(1, len(tasks) + 1):
+            if root_id in ranked:
+                continue
+            if len(tasks[root_id].children) == 0:
+                ranked.add(root_id)
+                order.append(root_id)
+                continue
+            # (task id, its children, next child to visit)
+            stack: list[tuple[int, list[int], int]] = [
+                (root_id, tasks[root_id].children, 0)
+            ]
+            while len(stack) != 0:
+                id, children, child_index = stack[-1]
+                if child_index < len(children):
+                    stack[-1] = (id, children, child_index + 1)
+                    child_id = children[child_index]
+                    if child_id not in ranked and len(tasks[child_id].children) != 0:
+                        stack.append((child_id, tasks[child_id].children, 0))
+                    continue
+                stack.pop()
+                ranked.add(id)
+                order.append(id)
+        if isinstance(tasks, CompactGraph):
+            tasks.topology.rank_order = order
+        return order
+
+    @staticmethod
+    def upward_ranks(tasks: dict[int, Task], verbose: bool = False) -> dict[int, float]:
+        """
+        Calculates the upward rank of every task in one reverse topological pass
+        """
+        if STATS.enabled:
+            STATS.count("ranked_tasks", len(tasks))
+        task_ids = list(range(1, len(tasks) + 1))
+        average_computations, edge_offsets, average_communications = HEFT.mean_costs(
+            tasks, task_ids
+        )
+        average_computations = average_computations.tolist()
+        average_communications = average_communications.tolist()
+        edge_offsets = edge_offsets.tolist()
+        # task-id -> rank
+        task_ranks: dict[int, float] = {}
+        for id in HEFT.ranking_order(tasks):
+            # Ids are 1..n, task id lives at index id - 1
+            index = id - 1
+            first_edge = edge_offsets[index]
+            if first_edge == edge_offsets[index + 1]:
+                task_ranks[id] = average_computations[index]
+                continue
+            # Every child with children is ranked now, exit tasks are ranked on the fly
+            longest_path = max(
+                average_communications[first_edge + offset]
+                + task_ranks.get(child_id, average_computations[child_id - 1])
+                for offset, child_id in enumerate(tasks[id].children)
+            )
+            task_ranks[id] = average_computations[index] + longest_path
+            if verbose:
+                print(f"{id} -> {task_ranks[id]}")
+        return task_ranks
 
     @staticmethod
     def is_interval_occupied_in_time(
@@ -78,90 +365,105 @@ class HEFT:
         """
         Finds the first time which we can schedule a task on a specific core
         """
-        occupied_intervals = sorted(
-            map(
-                lambda task: (task.start_time, task.computation_finish_time),
-                filter(
-                    lambda item: item.ran_cpu_id == cpu_id, scheduled_tasks
-                ),
-            ),
-            key=lambda item: item[0],  # sort by start time
+        timeline = CoreTimeline()
+        for task in filter(lambda item: item.ran_cpu_id == cpu_id, scheduled_tasks):
+            timeline.add_scheduled_task(task)
+        return timeline.earliest_start(fastest_start_time, computation_cost)
+
+    @staticmethod
+    def data_ready_times(
+        task: Task,
+        tasks: dict[int, Task],
+        scheduled_tasks: dict[int, ScheduledTask],
+        base_time: int,
+        cpus: int,
+    ) -> list[int]:
+        """
+        When the data of every parent can reach each core, for all cores at once.
+        No core is ready before base_time.
+        """
+        if STATS.enabled:
+            STATS.count("parent_edges", len(task.fathers))
+        if isinstance(tasks, CompactGraph):
+            parent_ids, edge_ids = tasks.parent_edges(task.id - 1)
+            if len(parent_ids) == 0:
+                return [base_time] * cpus
+            parents = [scheduled_tasks[parent_id] for parent_id in parent_ids]
+            # One communication cost row per parent, for the core it ran on
+            rows = tasks.communication.rows(
+                edge_ids, [parent.ran_cpu_id for parent in parents]
+            )
+            finish_times = np.array(
+                [parent.computation_finish_time for parent in parents], dtype=np.int64
+            )
+            ready_times = (rows + finish_times[:, None]).max(axis=0)
+            return np.maximum(ready_times, base_time).tolist()
+        ready_times = [base_time] * cpus
+        for parent_id in task.fathers:
+            assert parent_id in scheduled_tasks  # sanity check
+            parent = scheduled_tasks[parent_id]
+            row = tasks[parent_id].communication_cost[task.id][parent.ran_cpu_id]
+            finish_time = parent.computation_finish_time
+            ready_times = [
+                max(ready_time, communication_cost + finish_time)
+                for ready_time, communication_cost in zip(ready_times, row)
+            ]
+        return ready_times
+
+    @staticmethod
+    def earliest_finish_placement(
+        task: Task,
+        tasks: dict[int, Task],
+        scheduled_tasks: dict[int, ScheduledTask],
+        base_time: int,
+        timelines: "ProcessorTimelines",
+    ) -> ScheduledTask:
+        """
+        Picks the core which finishes the task first (the first one on ties).
+        The caller places the returned task on the timelines.
+        """
+        cpus = len(timelines.cores)
+        ready_times = HEFT.data_ready_times(task, tasks, scheduled_tasks, base_time, cpus)
+        if isinstance(tasks, CompactGraph):
+            computation_times = tasks.computation_rows()[task.id - 1]
+        else:
+            computation_times = task.computation_times
+        start_times = timelines.earliest_starts(ready_times, computation_times)
+        finish_times = [
+            start_time + computation_time
+            for start_time, computation_time in zip(start_times, computation_times)
+        ]
+        best_cpu_id = finish_times.index(min(finish_times))
+        return ScheduledTask(
+            task, best_cpu_id, start_times[best_cpu_id], computation_times[best_cpu_id]
         )
-        candidate_start_time = fastest_start_time
-        # This is a horrible way to do it but whatever
-        while HEFT.is_interval_occupied_in_time(
-            occupied_intervals,
-            (candidate_start_time, candidate_start_time + computation_cost),
-        ):
-            candidate_start_time += 1
-        return candidate_start_time
 
     @staticmethod
-    def schedule(tasks: dict[int, Task], cpus: int) -> dict[int, ScheduledTask]:
-        ranks = HEFT.rank(tasks)
+    @STATS.timed("heft_schedule")
+    def schedule(
+        tasks: dict[int, Task],
+        cpus: int,
+        ranks: list[tuple[float, Task]] | None = None,
+    ) -> dict[int, ScheduledTask]:
+        if ranks is None:
+            ranks = HEFT.rank(tasks)
         # task_id -> task
         scheduled_tasks: dict[int, ScheduledTask] = {}
+        timelines = ProcessorTimelines(cpus)
         for task in map(lambda rank: rank[1], ranks):
-            # cpu_id -> (start, finish) for each CPU core
-            cpu_runtimes: list[tuple[int, int]] = [(0, 0)] * cpus
-            for cpu_id in range(cpus):
-                processor_ready = 0  # when does this core can become available for scheduling this task
-                for parent_id in task.fathers:
-                    assert parent_id in scheduled_tasks  # sanity check
-                    communication_cost = tasks[parent_id].communication_cost[task.id][
-                        scheduled_tasks[parent_id].ran_cpu_id
-                    ][cpu_id]
-                    start_delay = (
-                        communication_cost
-                        + scheduled_tasks[parent_id].computation_finish_time
-                    )
-                    processor_ready = max(processor_ready, start_delay)
-                # Now calculate when we can schedule this task
-                cpu_start_time = HEFT.find_gap(
-                    scheduled_tasks.values(),
-                    cpu_id,
-                    processor_ready,
-                    task.computation_times[cpu_id],
-                )
-                cpu_runtimes[cpu_id] = (
-                    cpu_start_time,
-                    cpu_start_time + task.computation_times[cpu_id],
-                )
-            # Now check what CPU yields the fastest one
-            best_cpu_id = min(
-                range(len(cpu_runtimes)), key=lambda x: cpu_runtimes[x][1]
-            )
-            scheduled_tasks[task.id] = ScheduledTask(
-                task, best_cpu_id, cpu_runtimes[best_cpu_id][0]
+            scheduled_tasks[task.id] = HEFT.earliest_finish_placement(
+                task, tasks, scheduled_tasks, 0, timelines
             )
+            timelines.place(scheduled_tasks[task.id])
         return scheduled_tasks
     
     @staticmethod
-    def draw_chart(tasks : dict[int, ScheduledTask]):
-        colors = np.random.rand(len(tasks), 3)
-        all_schedules = [[[task.start_time, task.computation_finish_time]] for task in tasks.values()]
-
-        max_end = max([max(sched[-1][-1] for sched in all_schedules)])
-
-        fig, ax = plt.subplots(1, figsize=(8, 4))
-        for i, task in enumerate(tasks):
-
-            schedules = [[tasks[task].start_time, tasks[task].computation_finish_time]]
-            for start, end in schedules:
-                ax.broken_barh([(start, end-start)],
-                            (i-0.4, 0.8), facecolors=colors[i])
-                ax.annotate(tasks[task].ran_cpu_id, xy=(start + (end-start)/2, i-0.2), ha='center')
-            ax.text(-0.1, i, task, ha='right', va='center')
-
-        ax.set_xlim(0, max_end)
-        # ax.set_xticks(np.arange(0, max_end + 1, 1))
-        ax.set_xlabel('Time')
-        ax.set_ylabel('Tasks')
-        ax.set_yticklabels([])
-        ax.set_title('Gantt Chart')
-
-        plt.show()
+    def draw_chart(tasks : dict[int, ScheduledTask] | dict[int, dict[int, ScheduledTask]],
+                   path : str | None = None):
+        # Plotting libraries are only loaded by the processes which draw
+        from visualization import draw_chart
 
+        draw_chart(tasks, path)
 
     @staticmethod
     def calculate_makespan(tasks: dict[int, Task], cpus: int) -> int:
@@ -173,6 +475,87 @@ class HEFT:
     
 
 
+class StandaloneHEFT:
+    """
+    Memoized HEFT results of graphs scheduled alone, keyed by graph content and core count.
+    DAG construction, slowdown evaluation and MinMax all need the same standalone schedule,
+    so each graph is ranked and scheduled once per experiment.
+    Only the MAX_RESULTS most recently used results are kept, an evicted graph is just
+    scheduled again.
+    The cached ranks and schedules are shared, never modify them.
+    """
+
+    class Result:
+        def __init__(self, ranks: list[tuple[float, Task]], schedule: dict[int, ScheduledTask]):
+            self.ranks = ranks
+            self.schedule = schedule
+            self.makespan = HEFT.calculate_makespan_from_completed_tasks(schedule)
+            self.start = min(task.start_time for task in schedule.values())
+
+    MAX_RESULTS = 1024
+    # (graph fingerprint, cpus) -> result, least recently used first
+    results: OrderedDict[tuple[str, int], "StandaloneHEFT.Result"] = OrderedDict()
+
+    @staticmethod
+    @STATS.timed("fingerprint")
+    def fingerprint(tasks: dict[int, Task]) -> str:
+        """
+        Content hash of a graph, so copies of the same graph share one cache entry
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        if isinstance(tasks, CompactGraph):
+            # The structure is hashed once per topology, only costs are hashed per graph
+            digest.update(tasks.topology.fingerprint())
+            for array in (tasks.computation_times, *tasks.communication.arrays()):
+                digest.update(str(array.shape).encode())
+                digest.update(array.tobytes())
+        else:
+            for id in sorted(tasks.keys()):
+                digest.update(repr(tasks[id]).encode())
+        return digest.hexdigest()
+
+    @staticmethod
+    def cached_fingerprint(tasks: dict[int, Task]) -> str:
+        # Compact graphs keep their hash until their costs are replaced, dict graphs can
+        # be changed anywhere so they are hashed every time. DAG keeps the hash of its
+        # graph, pass it along instead when there is one.
+        if not isinstance(tasks, CompactGraph):
+            return StandaloneHEFT.fingerprint(tasks)
+        if tasks.digest is None:
+            tasks.digest = StandaloneHEFT.fingerprint(tasks)
+        return tasks.digest
+
+    @staticmethod
+    def result(
+        tasks: dict[int, Task], cpus: int, fingerprint: str | None = None
+    ) -> "StandaloneHEFT.Result":
+        if fingerprint is None:
+            fingerprint = StandaloneHEFT.cached_fingerprint(tasks)
+        key = (fingerprint, cpus)
+        result = StandaloneHEFT.results.get(key)
+        if STATS.enabled:
+            STATS.count("standalone_heft_misses" if result is None else "standalone_heft_hits")
+        if result is not None:
+            StandaloneHEFT.results.move_to_end(key)
+            return result
+        ranks = HEFT.rank(tasks)
+        result = StandaloneHEFT.Result(ranks, HEFT.schedule(tasks, cpus, ranks))
+        StandaloneHEFT.results[key] = result
+        if len(StandaloneHEFT.results) > StandaloneHEFT.MAX_RESULTS:
+            StandaloneHEFT.results.popitem(last=False)
+        return result
+
+    @staticmethod
+    def forget(tasks: dict[int, Task], cpus: int, fingerprint: str | None = None):
+        if fingerprint is None:
+            fingerprint = StandaloneHEFT.cached_fingerprint(tasks)
+        StandaloneHEFT.results.pop((fingerprint, cpus), None)
+
+    @staticmethod
+    def clear():
+        StandaloneHEFT.results.clear()
+
+
 if __name__ == "__main__":
     if len(sys.argv) < 4:
         print("Format should be as follows : method + num_of_tasks + cpu cores")
@@ -189,13 +572,13 @@ if __name__ == "__main__":
         print("Method should be : FFT - GE")
         exit(1)
     print("Currently have", len(graph), "tasks")
-    for task in graph.values():
-        task.populate_cpu_dependant_variables(cpu_cores)
+    task_generator.populate_costs(graph, cpu_cores)
+    standalone = StandaloneHEFT.result(graph, cpu_cores)
     print("Ranked tasks:")
-    pprint(HEFT.rank(graph))
-    sched = HEFT.schedule(graph, cpu_cores)
+    pprint(standalone.ranks)
+    sched = standalone.schedule
     pprint(sched)
-    print("Makespan:", max(map(lambda task: task.computation_finish_time, sched.values())))
+    print("Makespan:", standalone.makespan)
     HEFT.draw_chart(sched)
     # MultiTask
     #graph = task_generator.merge_tasks([task_generator.FFT(5).values(), task_generator.FFT(5).values(), task_generator.FFT(5).values()])
@@ -0,0 +1,130 @@
+import cProfile
+import functools
+import os
+import time
+from contextlib import contextmanager
+
+# Set to 1 to collect phase timers and counters, e.g. SCHEDULER_STATS=1 python scheduler.py ...
+ENABLE_VARIABLE = "SCHEDULER_STATS"
+# Set to a file name to dump a cProfile of the scheduler.py / experiments.py run there
+PROFILE_VARIABLE = "SCHEDULER_PROFILE"
+
+
+class NullPhase:
+    """
+    What phase() hands out while disabled, entering and leaving it does nothing
+    """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        return False
+
+
+NULL_PHASE = NullPhase()
+
+
+class Phase:
+    def __init__(self, stats: "Instrumentation", name: str):
+        self.stats = stats
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *_):
+        self.stats.timers[self.name] = self.stats.timers.get(self.name, 0.0) + (
+            time.perf_counter() - self.start
+        )
+        self.stats.calls[self.name] = self.stats.calls.get(self.name, 0) + 1
+        return False
+
+
+class Instrumentation:
+    """
+    Phase timers and counters of the scheduling engines.
+    Hot paths check enabled before touching anything, so being off costs one attribute
+    lookup per call site.
+    """
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        # name -> seconds / number of times the phase ran
+        self.timers: dict[str, float] = {}
+        self.calls: dict[str, int] = {}
+        # name -> count
+        self.counters: dict[str, int] = {}
+
+    def enable(self, enabled: bool = True):
+        self.enabled = enabled
+
+    def reset(self):
+        self.timers.clear()
+        self.calls.clear()
+        self.counters.clear()
+
+    def phase(self, name: str) -> Phase | NullPhase:
+        if not self.enabled:
+            return NULL_PHASE
+        return Phase(self, name)
+
+    def timed(self, name: str):
+        """
+        Decorator timing every call of a function as the given phase.
+        Phases nest, so the time of a phase includes the phases it calls.
+        """
+
+        def decorator(function):
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return function(*args, **kwargs)
+                with Phase(self, name):
+                    return function(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def count(self, name: str, amount: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def snapshot(self) -> dict:
+        return {
+            "timers": dict(self.timers),
+            "calls": dict(self.calls),
+            "counters": dict(self.counters),
+        }
+
+    def report(self) -> str:
+        lines = ["phase                      calls      seconds"]
+        for name, seconds in sorted(self.timers.items(), key=lambda item: -item[1]):
+            lines.append(f"{name:<24} {self.calls[name]:>7} {seconds:>12.6f}")
+        lines.append("counter                              count")
+        for name, count in sorted(self.counters.items()):
+            lines.append(f"{name:<24} {count:>15}")
+        return "\n".join(lines)
+
+
+STATS = Instrumentation(os.environ.get(ENABLE_VARIABLE, "") not in ("", "0"))
+
+
+@contextmanager
+def profiled(path: str | None = None):
+    """
+    Runs the block under cProfile and dumps the stats to path (default: the
+    SCHEDULER_PROFILE variable). Does nothing when there is no path.
+    """
+    path = path or os.environ.get(PROFILE_VARIABLE)
+    if not path:
+        yield
+        return
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(path)
@@ -0,0 +1,152 @@
+import numpy as np
+from heft import ScheduledTask, StandaloneHEFT
+from task_generator import Task
+from instrumentation import STATS
+
+
+class ScheduleArrays:
+    """
+    Flat view of a multi-DAG schedule, one row per placed task.
+    Rows are grouped by DAG: the tasks of dag_ids[i] are the rows
+    dag_offsets[i]:dag_offsets[i + 1], like the CSR arrays of CompactGraph.
+    """
+
+    def __init__(
+        self,
+        dag_ids: np.ndarray,
+        dag_offsets: np.ndarray,
+        task_ids: np.ndarray,
+        cpu_ids: np.ndarray,
+        start_times: np.ndarray,
+        finish_times: np.ndarray,
+    ):
+        self.dag_ids = dag_ids
+        self.dag_offsets = dag_offsets
+        self.task_ids = task_ids
+        self.cpu_ids = cpu_ids
+        self.start_times = start_times
+        self.finish_times = finish_times
+
+    def __len__(self) -> int:
+        return len(self.task_ids)
+
+    @staticmethod
+    def from_schedule(scheduled_tasks: dict[int, dict[int, ScheduledTask]]) -> "ScheduleArrays":
+        """
+        Flattens the dag_id -> task_id -> ScheduledTask output of the schedulers
+        """
+        dag_ids = np.fromiter(scheduled_tasks.keys(), dtype=np.int64, count=len(scheduled_tasks))
+        dag_offsets = np.zeros(len(scheduled_tasks) + 1, dtype=np.int64)
+        np.cumsum(
+            np.fromiter(map(len, scheduled_tasks.values()), dtype=np.int64, count=len(scheduled_tasks)),
+            out=dag_offsets[1:],
+        )
+        rows = np.array(
+            [
+                (task.task_id, task.ran_cpu_id, task.start_time, task.computation_finish_time)
+                for schedule in scheduled_tasks.values()
+                for task in schedule.values()
+            ],
+            dtype=np.int64,
+        ).reshape(-1, 4)
+        return ScheduleArrays(dag_ids, dag_offsets, rows[:, 0], rows[:, 1], rows[:, 2], rows[:, 3])
+
+
+class ScheduleMetrics:
+    """
+    Metrics of one multi-DAG schedule. Per-DAG arrays follow the order of
+    ScheduleArrays.dag_ids, per-core arrays are indexed by cpu id.
+    """
+
+    def __init__(self, schedule: ScheduleArrays, own_makespans: np.ndarray, cpus: int):
+        self.dag_ids = schedule.dag_ids
+        self.cpus = cpus
+        # Every DAG has at least one task, so no reduceat segment is empty
+        first_rows = schedule.dag_offsets[:-1]
+        self.starts = np.minimum.reduceat(schedule.start_times, first_rows)
+        self.ends = np.maximum.reduceat(schedule.finish_times, first_rows)
+        self.makespans = self.ends - self.starts
+        self.own_makespans = own_makespans
+        self.slowdowns = own_makespans / self.makespans
+        self.average_slowdown = float(self.slowdowns.mean())
+        self.unfairnesses = np.abs(self.slowdowns - self.average_slowdown)
+        self.unfairness = float(self.unfairnesses.sum())
+        self.start = int(self.starts.min())
+        self.end = int(self.ends.max())
+        self.makespan = self.end - self.start
+
+        self.busy_times = np.bincount(
+            schedule.cpu_ids,
+            weights=schedule.finish_times - schedule.start_times,
+            minlength=cpus,
+        ).astype(np.int64)
+        span = max(self.makespan, 1)
+        self.core_utilizations = self.busy_times / span
+        self.utilization = float(self.busy_times.sum() / (cpus * span))
+
+        # Intervals are closed, so back to back tasks on a core are one time step apart
+        # and only what is left over counts as idle
+        # Tasks never share a start time on a core, so one unstable sort on a combined
+        # (cpu, start) key orders them and is much faster than lexsort
+        order = np.argsort(schedule.cpu_ids * (self.end + 1) + schedule.start_times)
+        cpu_ids = schedule.cpu_ids[order]
+        gaps = schedule.start_times[order][1:] - schedule.finish_times[order][:-1] - 1
+        self.idle_gaps = gaps[(cpu_ids[1:] == cpu_ids[:-1]) & (gaps > 0)]
+
+    def idle_gap_stats(self) -> dict[str, float]:
+        if len(self.idle_gaps) == 0:
+            return {"count": 0, "total": 0, "mean": 0.0, "max": 0}
+        return {
+            "count": len(self.idle_gaps),
+            "total": int(self.idle_gaps.sum()),
+            "mean": float(self.idle_gaps.mean()),
+            "max": int(self.idle_gaps.max()),
+        }
+
+    def per_dag(self) -> dict[int, dict[str, float]]:
+        """
+        dag_id -> start, end, makespan, own makespan, slowdown and unfairness as plain numbers
+        """
+        columns = {
+            "start": self.starts.tolist(),
+            "end": self.ends.tolist(),
+            "makespan": self.makespans.tolist(),
+            "own_makespan": self.own_makespans.tolist(),
+            "slowdown": self.slowdowns.tolist(),
+            "unfairness": self.unfairnesses.tolist(),
+        }
+        return {
+            dag_id: {name: values[i] for name, values in columns.items()}
+            for i, dag_id in enumerate(self.dag_ids.tolist())
+        }
+
+    def summary(self) -> dict[str, float]:
+        return {
+            "makespan": self.makespan,
+            "unfairness": self.unfairness,
+            "average_slowdown": self.average_slowdown,
+            "utilization": self.utilization,
+            **{f"idle_gap_{name}": value for name, value in self.idle_gap_stats().items()},
+        }
+
+
+def own_makespans(dag_ids: np.ndarray, dags: dict[int, dict[int, Task]], cpus: int) -> np.ndarray:
+    """
+    Makespan of each DAG scheduled alone by HEFT, read from the standalone cache
+    """
+    results = [StandaloneHEFT.result(dags[dag_id], cpus) for dag_id in dag_ids.tolist()]
+    return np.array([result.makespan - result.start for result in results], dtype=np.int64)
+
+
+@STATS.timed("slowdown")
+def evaluate(
+    scheduled_tasks: dict[int, dict[int, ScheduledTask]] | ScheduleArrays,
+    dags: dict[int, dict[int, Task]],
+    cpus: int,
+) -> ScheduleMetrics:
+    schedule = (
+        scheduled_tasks
+        if isinstance(scheduled_tasks, ScheduleArrays)
+        else ScheduleArrays.from_schedule(scheduled_tasks)
+    )
+    return ScheduleMetrics(schedule, own_makespans(schedule.dag_ids, dags, cpus), cpus)
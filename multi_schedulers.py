@@ -1,120 +1,193 @@
-import copy
+import heapq
 import random
-from heft import HEFT, ScheduledTask
+from heft import HEFT, ProcessorTimelines, ScheduledTask, StandaloneHEFT
 from task_generator import Task, generate_tasks
+from instrumentation import STATS
 
 class DAG:
-    def __init__(self, id: int, tasks: dict[int, Task], cpus: int):
+    """
+    A graph with its release time and standalone HEFT results.
+    Schedulers treat DAGs as immutable, so one set of DAGs can be fed to all of them.
+    """
+
+    def __init__(self, id: int, tasks: dict[int, Task], cpus: int, release_time: int | None = None):
         self.id = id
         self.tasks = tasks
-        self.release_time = random.randint(0, 500)
-        self.lowerbound = HEFT.calculate_makespan(tasks, cpus)
-        self.ranks = HEFT.rank(tasks)
+        # Random arrival unless replaying a saved workload
+        self.release_time = random.randint(0, 500) if release_time is None else release_time
+        # Hashing a dict graph walks all of it, so it is done once per DAG
+        self.fingerprint = StandaloneHEFT.cached_fingerprint(tasks)
+        standalone = StandaloneHEFT.result(tasks, cpus, self.fingerprint)
+        self.lowerbound = standalone.makespan
+        self.ranks = standalone.ranks
 
 class MinMax:
     @staticmethod
+    @STATS.timed("minmax")
     def schedule(dags: dict[int, DAG], cpus: int) -> dict[dict[int, ScheduledTask]]:
-        dags_list = list(dags.values())
+        # DAGs waiting for their release as (release_time, order, dag)
+        pending_dags: list[tuple[int, int, DAG]] = [
+            (dag.release_time, order, dag) for order, dag in enumerate(dags.values())
+        ]
+        heapq.heapify(pending_dags)
+        # Released DAGs as (lowerbound, order, dag), order breaks ties like the input order
+        runnable_dags: list[tuple[int, int, DAG]] = []
         result: dict[dict[int, ScheduledTask]] = {}
         current_time = 0
-        while len(dags_list) != 0:
-            # Always advance time in order to check for dynamic scheduling
+        while len(pending_dags) != 0 or len(runnable_dags) != 0:
+            # Time always moves at least one unit after each event
             current_time += 1
-            # Check if we can run any DAG
-            runnable_dags = list(filter(lambda dag: dag.release_time <= current_time, dags_list))
             if len(runnable_dags) == 0:
-                continue
+                # Nothing can run before the next release, so jump straight to it
+                current_time = max(current_time, pending_dags[0][0])
+            while len(pending_dags) != 0 and pending_dags[0][0] <= current_time:
+                _, order, dag = heapq.heappop(pending_dags)
+                heapq.heappush(runnable_dags, (dag.lowerbound, order, dag))
             # If we have reached here, it means that we have at least one runnable dag
-            candidate_index = min(range(len(runnable_dags)), key=lambda dag_index: runnable_dags[dag_index].lowerbound)
-            # Schedule the task
-            scheduled_dag = HEFT.schedule(runnable_dags[candidate_index].tasks, cpus)
-            dags_list = list(filter(lambda dag: dag.id != runnable_dags[candidate_index].id, dags_list))
-            # Fix the scheduled tasks based on current time
-            time_to_advance = 0
-            for scheduled_task in scheduled_dag.values():
-                time_to_advance = max(time_to_advance, scheduled_task.computation_finish_time)
-                scheduled_task.start_time += current_time
-                scheduled_task.computation_finish_time += current_time
-            result[runnable_dags[candidate_index].id] = scheduled_dag
-            # Now advance the time
-            current_time += time_to_advance
+            _, _, candidate_dag = heapq.heappop(runnable_dags)
+            # Schedule the task, the standalone schedule is shared so shift copies of it
+            standalone = StandaloneHEFT.result(candidate_dag.tasks, cpus, candidate_dag.fingerprint)
+            result[candidate_dag.id] = {
+                task_id: scheduled_task.shifted(current_time)
+                for task_id, scheduled_task in standalone.schedule.items()
+            }
+            # Now advance the time to the completion of this DAG
+            current_time += standalone.makespan
         return result
 
+class ReadyQueue:
+    """
+    Global priority heap of the tasks whose parents are all scheduled, over every DAG.
+    Tasks are keyed by their rank plus the release time of their DAG.
+    """
+
+    def __init__(self, highest_rank_first: bool):
+        self.highest_rank_first = highest_rank_first
+        # (key, dag order, rank order, dag_id, task)
+        self.heap: list[tuple[float, int, int, int, Task]] = []
+        # dag_id -> task_id -> number of parents which are not scheduled yet
+        self.unfinished_parents: dict[int, dict[int, int]] = {}
+        # dag_id -> task_id -> (priority, rank order)
+        self.priorities: dict[int, dict[int, tuple[float, int]]] = {}
+        self.dag_orders: dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.heap)
+
+    def release(self, dag: DAG, order: int, release_time: int | None = None):
+        if release_time is None:
+            release_time = dag.release_time
+        self.dag_orders[dag.id] = order
+        self.priorities[dag.id] = {}
+        self.unfinished_parents[dag.id] = {}
+        for rank_order, (rank, task) in enumerate(dag.ranks):
+            self.priorities[dag.id][task.id] = (rank + release_time, rank_order)
+            self.unfinished_parents[dag.id][task.id] = len(task.fathers)
+        for _, task in dag.ranks:
+            if self.unfinished_parents[dag.id][task.id] == 0:
+                self.push(dag.id, task)
+
+    def push(self, dag_id: int, task: Task):
+        priority, rank_order = self.priorities[dag_id][task.id]
+        key = -priority if self.highest_rank_first else priority
+        heapq.heappush(
+            self.heap, (key, self.dag_orders[dag_id], rank_order, dag_id, task)
+        )
+
+    def pop_all(self) -> list[tuple[int, Task]]:
+        """
+        Takes every task which is ready right now, best first
+        """
+        ready_tasks: list[tuple[int, Task]] = []
+        while len(self.heap) != 0:
+            _, _, _, dag_id, task = heapq.heappop(self.heap)
+            ready_tasks.append((dag_id, task))
+        return ready_tasks
+
+    def mark_scheduled(self, dag: DAG, task: Task):
+        unfinished_parents = self.unfinished_parents[dag.id]
+        del unfinished_parents[task.id]
+        for child_id in task.children:
+            unfinished_parents[child_id] -= 1
+            if unfinished_parents[child_id] == 0:
+                self.push(dag.id, dag.tasks[child_id])
+
+    def is_dag_done(self, dag_id: int) -> bool:
+        return len(self.unfinished_parents[dag_id]) == 0
+
+    def forget(self, dag_id: int):
+        """
+        Drops the bookkeeping of a DAG whose tasks are all scheduled
+        """
+        del self.unfinished_parents[dag_id]
+        del self.priorities[dag_id]
+        del self.dag_orders[dag_id]
+
+
 class FDWS_RANK_HYBRID:
     @staticmethod
-    def reduce_task_list(scheduled_tasks: dict[int, dict[int, ScheduledTask]]) -> list[ScheduledTask]:
-        result: list[ScheduledTask] = []
-        for tasks in scheduled_tasks.values():
-            result.extend(tasks.values())
-        return result
+    def place_task(
+        task: Task,
+        tasks: dict[int, Task],
+        scheduled_tasks: dict[int, ScheduledTask],
+        release_time: int,
+        timelines: ProcessorTimelines,
+    ) -> ScheduledTask:
+        """
+        Places a ready task of a DAG on the core which finishes it first (EFT), just like
+        HEFT.schedule, but sharing the cores with every other DAG
+        """
+        scheduled_task = HEFT.earliest_finish_placement(
+            task, tasks, scheduled_tasks, release_time, timelines
+        )
+        timelines.place(scheduled_task)
+        return scheduled_task
 
     @staticmethod
+    @STATS.timed("fdws_rank_hybrid")
     def schedule(dags: dict[int, DAG], cpus: int, is_fdws: bool) -> dict[dict[int, ScheduledTask]]:
-        dags = copy.deepcopy(dags)
+        # dags are only read, the scheduling state lives in result, timelines and ready_queue
         # dag_id -> task_id -> task
         result: dict[int, dict[int, ScheduledTask]] = {}
         for dag_id in dags.keys():
             result[dag_id] = {}
-        while any(map(lambda dag: len(dag.ranks) != 0, dags.values())):
+        # Shared by every DAG, so probing a core never walks the tasks scheduled so far
+        timelines = ProcessorTimelines(cpus)
+        # FDWS serves the highest rank first, Rank-Hybrid the lowest
+        ready_queue = ReadyQueue(highest_rank_first=is_fdws)
+        # DAGs which are not released yet as (release_time, order, dag_id)
+        waiting_dags: list[tuple[int, int, int]] = [
+            (dag.release_time, order, dag_id)
+            for order, (dag_id, dag) in enumerate(dags.items())
+        ]
+        heapq.heapify(waiting_dags)
+        while len(waiting_dags) != 0 or len(ready_queue) != 0:
             # At first get the current time
-            current_time = min(map(lambda dag: dag.release_time, filter(lambda dag: len(dag.ranks) != 0, dags.values()))) # default is the release time of the first DAG
-            if len(FDWS_RANK_HYBRID.reduce_task_list(result)) != 0:
-                current_time = max(current_time, max(map(lambda task: task.computation_finish_time, FDWS_RANK_HYBRID.reduce_task_list(result))))
-            # Fill the ready queue
-            # (rank, dag_id, task)
-            ready_queue: list[tuple[float, int, Task]] = []
-            for dag_id, dag in filter(lambda d: d[1].release_time <= current_time, dags.items()):
-                if len(dag.ranks) != 0:
-                    (rank, task) = dag.ranks.pop(0)
-                    # TODO: check + release_time
-                    ready_queue.append((rank + dag.release_time, dag_id, task))
-            # Now sort the ready queue based on rank
-            ready_queue = sorted(ready_queue, key=lambda x: x[0], reverse=is_fdws)
-            # For each task in queue, schedule it by EFT
+            current_time = timelines.latest_finish_time
+            if len(ready_queue) == 0:
+                # Nothing to run before the next DAG is released
+                current_time = max(current_time, waiting_dags[0][0])
+            if STATS.enabled:
+                STATS.count("ready_rounds")
+            # Release every DAG which has arrived until now
+            while len(waiting_dags) != 0 and waiting_dags[0][0] <= current_time:
+                _, order, dag_id = heapq.heappop(waiting_dags)
+                ready_queue.release(dags[dag_id], order)
+            # For each ready task, schedule it by EFT
             # Just like EFT.schedule
-            for _, dag_id, task in ready_queue:
-                # cpu_id -> (start, finish) for each CPU core
-                cpu_runtimes: list[tuple[int, int]] = [(0, 0)] * cpus
-                for cpu_id in range(cpus):
-                    processor_ready = dags[dag_id].release_time  # when does this core can become available for scheduling this task
-                    for parent_id in task.fathers:
-                        assert parent_id in result[dag_id]  # sanity check
-                        communication_cost = dags[dag_id].tasks[parent_id].communication_cost[task.id][
-                            result[dag_id][parent_id].ran_cpu_id
-                        ][cpu_id]
-                        start_delay = (
-                            communication_cost
-                            + result[dag_id][parent_id].computation_finish_time
-                        )
-                        processor_ready = max(processor_ready, start_delay)
-                    # Now calculate when we can schedule this task
-                    cpu_start_time = HEFT.find_gap(
-                        FDWS_RANK_HYBRID.reduce_task_list(result),
-                        cpu_id,
-                        processor_ready,
-                        task.computation_times[cpu_id],
-                    )
-                    cpu_runtimes[cpu_id] = (
-                        cpu_start_time,
-                        cpu_start_time + task.computation_times[cpu_id],
-                    )
-                # Now check what CPU yields the fastest one
-                best_cpu_id = min(
-                    range(len(cpu_runtimes)), key=lambda x: cpu_runtimes[x][1]
-                )
-                result[dag_id][task.id] = ScheduledTask(
-                    task, best_cpu_id, cpu_runtimes[best_cpu_id][0]
+            for dag_id, task in ready_queue.pop_all():
+                result[dag_id][task.id] = FDWS_RANK_HYBRID.place_task(
+                    task, dags[dag_id].tasks, result[dag_id], dags[dag_id].release_time, timelines
                 )
+                # Children whose parents are all placed now join the next round
+                ready_queue.mark_scheduled(dags[dag_id], task)
         return result
-    
+
 def sample_run():
     CORES = 4
-    dags: dict[int, DAG] = {}
-    for i in range(5):
-        tasks = generate_tasks.FFT(5)
-        for task in tasks.values():
-            task.populate_cpu_dependant_variables(CORES)
-        dags[i] = DAG(i, tasks, CORES)
+    graphs = generate_tasks.instances("FFT", 5, 5)
+    generate_tasks.populate_costs_batch(graphs, CORES)
+    dags = {i: DAG(i, tasks, CORES) for i, tasks in enumerate(graphs)}
     print("MinMax:", MinMax.schedule(dags, CORES))
     print("FDWS:", FDWS_RANK_HYBRID.schedule(dags, CORES, True))
     print("Rank Hybrid:", FDWS_RANK_HYBRID.schedule(dags, CORES, False))
@@ -0,0 +1,183 @@
+import copy
+import heapq
+from heft import HEFT, ProcessorTimelines, ScheduledTask
+from multi_schedulers import DAG
+from instrumentation import STATS
+
+# Busy interval put on a lost core, no task can be placed after it
+LOST_CORE_UNTIL = 2**62
+
+
+class TaskOverrun:
+    """
+    A task which started runs delta time steps longer than its estimate
+    """
+
+    def __init__(self, dag_id: int, task_id: int, delta: int):
+        self.dag_id = dag_id
+        self.task_id = task_id
+        self.delta = delta
+
+
+class CoreLoss:
+    """
+    A core goes offline, whatever runs on it is lost and has to start over elsewhere
+    """
+
+    def __init__(self, core: int):
+        self.core = core
+
+
+class ScheduleRepair:
+    """
+    Keeps a multi DAG schedule (a single HEFT schedule is {0: schedule} with
+    {0: DAG(0, graph, cpus, 0)}) together with its core timelines, so an event only
+    moves the tasks it affects: the ones which have not started, hit by the event, and
+    their descendants. Everything else keeps its placement. Moved tasks are placed
+    again by upward rank, with the ranks the DAGs already carry, at their earliest
+    finish time after the current time.
+    Building the repairer costs one pass over the schedule, a repair only grows with
+    the affected subgraph.
+    """
+
+    def __init__(
+        self,
+        scheduled_tasks: dict[int, dict[int, ScheduledTask]],
+        dags: dict[int, DAG],
+        cpus: int,
+    ):
+        self.dags = dags
+        self.cpus = cpus
+        # Placements are replaced and never modified, so the input schedule stays intact
+        self.scheduled_tasks = {
+            dag_id: dict(schedule) for dag_id, schedule in scheduled_tasks.items()
+        }
+        self.timelines = ProcessorTimelines(cpus)
+        # cpu -> start time -> (dag_id, task_id), start times are unique on a core
+        self.core_tasks: list[dict[int, tuple[int, int]]] = [{} for _ in range(cpus)]
+        for dag_id, schedule in self.scheduled_tasks.items():
+            for task_id, scheduled_task in schedule.items():
+                self.timelines.place(scheduled_task)
+                self.core_tasks[scheduled_task.ran_cpu_id][scheduled_task.start_time] = (
+                    dag_id,
+                    task_id,
+                )
+        self.dag_order = {dag_id: order for order, dag_id in enumerate(dags)}
+        # dag_id -> task_id -> upward rank, filled the first time a DAG is repaired
+        self.ranks: dict[int, dict[int, float]] = {}
+        self.lost_cores: set[int] = set()
+
+    def tasks_on_core(self, cpu: int, after: int) -> list[tuple[int, int]]:
+        """
+        (dag_id, task_id) of the tasks of a core finishing at or after the given time
+        """
+        return [
+            self.core_tasks[cpu][start_time]
+            for start_time, _ in self.timelines.cores[cpu].intervals_after(after)
+        ]
+
+    def descendants(self, seeds: list[tuple[int, int]]) -> set[tuple[int, int]]:
+        affected = set(seeds)
+        stack = list(seeds)
+        while len(stack) != 0:
+            dag_id, task_id = stack.pop()
+            for child_id in self.dags[dag_id].tasks[task_id].children:
+                if (dag_id, child_id) not in affected:
+                    affected.add((dag_id, child_id))
+                    stack.append((dag_id, child_id))
+        return affected
+
+    def rank_of(self, dag_id: int, task_id: int) -> float:
+        if dag_id not in self.ranks:
+            self.ranks[dag_id] = {task.id: rank for rank, task in self.dags[dag_id].ranks}
+        return self.ranks[dag_id][task_id]
+
+    def unplace(self, dag_id: int, task_id: int) -> ScheduledTask:
+        scheduled_task = self.scheduled_tasks[dag_id].pop(task_id)
+        self.timelines.remove(scheduled_task)
+        del self.core_tasks[scheduled_task.ran_cpu_id][scheduled_task.start_time]
+        return scheduled_task
+
+    def place(self, dag_id: int, scheduled_task: ScheduledTask):
+        self.scheduled_tasks[dag_id][scheduled_task.task_id] = scheduled_task
+        self.timelines.place(scheduled_task)
+        self.core_tasks[scheduled_task.ran_cpu_id][scheduled_task.start_time] = (
+            dag_id,
+            scheduled_task.task_id,
+        )
+
+    @STATS.timed("repair")
+    def repair(
+        self, now: int, event: TaskOverrun | CoreLoss
+    ) -> dict[int, dict[int, ScheduledTask]]:
+        """
+        Applies an event happening at time now (tasks starting at or before now have
+        started) and returns the new placement of every task which moved.
+        An overrun reported after its task's planned finish is rejected when a task it
+        would push back (a child or the next task on its core) has started by now.
+        """
+        if isinstance(event, TaskOverrun):
+            scheduled_task = self.scheduled_tasks[event.dag_id][event.task_id]
+            if scheduled_task.start_time > now:
+                raise ValueError(f"Task {event.task_id} of dag {event.dag_id} has not started")
+            if scheduled_task.ran_cpu_id in self.lost_cores:
+                raise ValueError(f"Task {event.task_id} of dag {event.dag_id} ran on a lost core")
+            finish_time = scheduled_task.computation_finish_time + event.delta
+            # Tasks after it on its core which the longer run now overlaps
+            seeds = []
+            for start_time, _ in self.timelines.cores[scheduled_task.ran_cpu_id].intervals_after(
+                scheduled_task.computation_finish_time + 1
+            ):
+                if start_time > finish_time:
+                    break
+                seeds.append(self.core_tasks[scheduled_task.ran_cpu_id][start_time])
+            seeds.extend(
+                (event.dag_id, child_id)
+                for child_id in self.dags[event.dag_id].tasks[event.task_id].children
+            )
+            # Reported after its planned finish, a task it pushes back may already run
+            for dag_id, task_id in seeds:
+                if self.scheduled_tasks[dag_id][task_id].start_time <= now:
+                    raise ValueError(
+                        f"Task {task_id} of dag {dag_id} already started, the overrun of "
+                        f"task {event.task_id} of dag {event.dag_id} is reported too late"
+                    )
+            self.unplace(event.dag_id, event.task_id)
+            overrun_task = copy.copy(scheduled_task)
+            overrun_task.computation_finish_time = finish_time
+            self.place(event.dag_id, overrun_task)
+        elif isinstance(event, CoreLoss):
+            if event.core in self.lost_cores:
+                raise ValueError(f"Core {event.core} is already lost")
+            # Everything not finished by now, the running task included, has to move
+            seeds = self.tasks_on_core(event.core, now + 1)
+            self.lost_cores.add(event.core)
+        else:
+            raise ValueError("Event should be a TaskOverrun or a CoreLoss")
+        affected = self.descendants(seeds)
+        if STATS.enabled:
+            STATS.count("repaired_tasks", len(affected))
+        for dag_id, task_id in affected:
+            self.unplace(dag_id, task_id)
+        if isinstance(event, CoreLoss):
+            self.timelines.cores[event.core].add(now + 1, LOST_CORE_UNTIL)
+        # Upward ranks decrease along every edge, so rank order keeps parents first
+        order = [
+            (-self.rank_of(dag_id, task_id), self.dag_order[dag_id], dag_id, task_id)
+            for dag_id, task_id in affected
+        ]
+        heapq.heapify(order)
+        moved: dict[int, dict[int, ScheduledTask]] = {}
+        while len(order) != 0:
+            _, _, dag_id, task_id = heapq.heappop(order)
+            dag = self.dags[dag_id]
+            scheduled_task = HEFT.earliest_finish_placement(
+                dag.tasks[task_id],
+                dag.tasks,
+                self.scheduled_tasks[dag_id],
+                max(now + 1, dag.release_time),
+                self.timelines,
+            )
+            self.place(dag_id, scheduled_task)
+            moved.setdefault(dag_id, {})[task_id] = scheduled_task
+        return moved
@@ -0,0 +1,125 @@
+import hashlib
+import os
+import sqlite3
+
+# Files whose content decides the scheduling results
+SOURCE_FILES = ["task_generator.py", "heft.py", "multi_schedulers.py", "scheduler.py", "metrics.py", "communication.py"]
+
+KEY_COLUMNS = ["generator", "tasks", "cores", "graphs", "algorithm", "seed", "code_version"]
+
+
+def code_version() -> str:
+    """
+    Hash of the scheduling sources, so results of older code are never reused
+    """
+    digest = hashlib.blake2b(digest_size=8)
+    directory = os.path.dirname(os.path.abspath(__file__))
+    for file_name in SOURCE_FILES:
+        with open(os.path.join(directory, file_name), "rb") as source:
+            digest.update(source.read())
+    return digest.hexdigest()
+
+
+class ResultStore:
+    """
+    SQLite store of experiment records: one row per (configuration, algorithm) in runs
+    and one row per DAG of that run in dag_results
+    """
+
+    def __init__(self, path: str, version: str | None = None):
+        self.path = path
+        self.version = version or code_version()
+        self.connection = sqlite3.connect(path)
+        key = ", ".join(KEY_COLUMNS)
+        with self.connection:
+            self.connection.execute(
+                f"""CREATE TABLE IF NOT EXISTS runs (
+                    generator TEXT, tasks INTEGER, cores INTEGER, graphs INTEGER,
+                    algorithm TEXT, seed INTEGER, code_version TEXT,
+                    makespan INTEGER, unfairness REAL,
+                    PRIMARY KEY ({key}))"""
+            )
+            self.connection.execute(
+                f"""CREATE TABLE IF NOT EXISTS dag_results (
+                    generator TEXT, tasks INTEGER, cores INTEGER, graphs INTEGER,
+                    algorithm TEXT, seed INTEGER, code_version TEXT, dag_id INTEGER,
+                    makespan INTEGER, own_makespan INTEGER, slowdown REAL, unfairness REAL,
+                    PRIMARY KEY ({key}, dag_id))"""
+            )
+
+    def record_key(self, record: dict) -> tuple:
+        return tuple(
+            self.version if column == "code_version" else record[column]
+            for column in KEY_COLUMNS
+        )
+
+    def done_keys(self) -> set[tuple]:
+        """
+        Keys of every run of the current code version, without the version column
+        """
+        rows = self.connection.execute(
+            f"SELECT {', '.join(KEY_COLUMNS[:-1])} FROM runs WHERE code_version = ?",
+            (self.version,),
+        )
+        return set(rows)
+
+    def save(self, records: list[dict]):
+        """
+        Writes records (as returned by experiments.run_experiment) in one transaction
+        """
+        runs = []
+        dag_results = []
+        for record in records:
+            key = self.record_key(record)
+            runs.append(key + (record["makespan"], record["unfairness"]))
+            for dag_id, metrics in record.get("dags", {}).items():
+                dag_results.append(
+                    key
+                    + (
+                        dag_id,
+                        metrics["makespan"],
+                        metrics["own_makespan"],
+                        metrics["slowdown"],
+                        metrics["unfairness"],
+                    )
+                )
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO runs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", runs
+            )
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO dag_results VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                dag_results,
+            )
+
+    def load(self, with_dags: bool = False) -> list[dict]:
+        """
+        Every record of the current code version, in the shape run_experiment returns
+        """
+        columns = KEY_COLUMNS[:-1] + ["makespan", "unfairness"]
+        records = [
+            dict(zip(columns, row))
+            for row in self.connection.execute(
+                f"SELECT {', '.join(columns)} FROM runs WHERE code_version = ?",
+                (self.version,),
+            )
+        ]
+        if not with_dags:
+            return records
+        by_key = {tuple(record[c] for c in KEY_COLUMNS[:-1]): record for record in records}
+        for record in records:
+            record["dags"] = {}
+        dag_columns = ["dag_id", "makespan", "own_makespan", "slowdown", "unfairness"]
+        rows = self.connection.execute(
+            f"SELECT {', '.join(KEY_COLUMNS[:-1] + dag_columns)} FROM dag_results "
+            "WHERE code_version = ?",
+            (self.version,),
+        )
+        for row in rows:
+            key, values = row[: len(KEY_COLUMNS) - 1], row[len(KEY_COLUMNS) - 1 :]
+            if key in by_key:
+                by_key[key]["dags"][values[0]] = dict(zip(dag_columns[1:], values[1:]))
+        return records
+
+    def close(self):
+        self.connection.close()
@@ -0,0 +1,185 @@
+import heapq
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from heft import ScheduledTask, StandaloneHEFT
+from multi_schedulers import DAG
+from scheduler import ALGORITHMS, run_algorithm
+from task_generator import CompactGraph, Task
+import metrics
+
+# Hierarchical scheduling: the cores are split into clusters, every DAG goes to one
+# cluster and each cluster is scheduled on its own, in parallel worker processes.
+
+
+def cluster_cores(cpus: int, clusters: int) -> list[range]:
+    """
+    Splits cores 0..cpus-1 into clusters contiguous ranges of (almost) equal size
+    """
+    # Mean communication costs are undefined on a single core
+    if cpus < 2 * clusters:
+        raise ValueError("Every cluster needs at least 2 cores")
+    bounds = [cluster * cpus // clusters for cluster in range(clusters + 1)]
+    return [range(first, last) for first, last in zip(bounds, bounds[1:])]
+
+
+def assign_dags(dags: dict[int, DAG], cores: list[range]) -> list[list[int]]:
+    """
+    Longest processing time first: the DAG with the largest lowerbound goes to the
+    cluster with the least lowerbound per core so far
+    """
+    # (load per core, cluster)
+    loads = [(0.0, cluster) for cluster in range(len(cores))]
+    assignment: list[list[int]] = [[] for _ in cores]
+    for dag in sorted(dags.values(), key=lambda dag: -dag.lowerbound):
+        load, cluster = heapq.heappop(loads)
+        assignment[cluster].append(dag.id)
+        heapq.heappush(loads, (load + dag.lowerbound / len(cores[cluster]), cluster))
+    # Keep the input order inside each cluster, the schedulers break ties with it
+    order = {dag_id: i for i, dag_id in enumerate(dags)}
+    return [sorted(dag_ids, key=order.get) for dag_ids in assignment]
+
+
+def restrict_cores(tasks: dict[int, Task] | CompactGraph, cores: range) -> dict[int, Task] | CompactGraph:
+    """
+    Copy of a graph which only knows the costs of the given cores, renumbered from 0
+    """
+    if isinstance(tasks, CompactGraph):
+        return CompactGraph(
+            tasks.topology,
+            tasks.computation_times[:, cores.start : cores.stop],
+            tasks.communication.restricted(cores),
+        )
+    restricted: dict[int, Task] = {}
+    for id, task in tasks.items():
+        restricted[id] = Task(id)
+        restricted[id].fathers = list(task.fathers)
+        restricted[id].children = list(task.children)
+        restricted[id].computation_times = list(task.computation_times[cores.start : cores.stop])
+        restricted[id].communication_cost = {
+            child_id: [row[cores.start : cores.stop] for row in costs[cores.start : cores.stop]]
+            for child_id, costs in task.communication_cost.items()
+        }
+    return restricted
+
+
+def schedule_cluster(
+    algorithm: str, cores: range, graphs: list[tuple[int, dict[int, Task] | CompactGraph, int]]
+) -> dict[int, dict[int, ScheduledTask]]:
+    """
+    Worker side: schedules (dag_id, restricted graph, release time) triples on one
+    cluster and moves the placements back to global core ids
+    """
+    dags = {
+        dag_id: DAG(dag_id, graph, len(cores), release_time)
+        for dag_id, graph, release_time in graphs
+    }
+    result = run_algorithm(algorithm, dags, len(cores))
+    # The restricted graphs are never looked up again, with workers=1 their standalone
+    # results would otherwise stay in this process' cache
+    for dag in dags.values():
+        StandaloneHEFT.forget(dag.tasks, len(cores), dag.fingerprint)
+    for schedule in result.values():
+        for scheduled_task in schedule.values():
+            scheduled_task.ran_cpu_id += cores.start
+    return result
+
+
+def schedule_sharded(
+    algorithm: str,
+    dags: dict[int, DAG],
+    cpus: int,
+    clusters: int,
+    workers: int | None = None,
+) -> dict[int, dict[int, ScheduledTask]]:
+    """
+    Same output as the global schedulers, each DAG running on the cores of one cluster.
+    workers=1 schedules the clusters one after the other in this process.
+    """
+    if algorithm not in ALGORITHMS:
+        raise ValueError(f"Algorithm should be one of : {' - '.join(ALGORITHMS)}")
+    cores = cluster_cores(cpus, clusters)
+    jobs = [
+        (
+            algorithm,
+            cluster,
+            [
+                (dag_id, restrict_cores(dags[dag_id].tasks, cluster), dags[dag_id].release_time)
+                for dag_id in dag_ids
+            ],
+        )
+        for cluster, dag_ids in zip(cores, assign_dags(dags, cores))
+        if len(dag_ids) != 0
+    ]
+    if workers == 1:
+        results = [schedule_cluster(*job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+            results = list(executor.map(schedule_cluster, *zip(*jobs)))
+    merged: dict[int, dict[int, ScheduledTask]] = {}
+    for result in results:
+        merged.update(result)
+    return {dag_id: merged[dag_id] for dag_id in dags}
+
+
+def compare_with_global(
+    algorithm: str,
+    dags: dict[int, DAG],
+    cpus: int,
+    clusters: int,
+    workers: int | None = None,
+) -> dict:
+    """
+    Schedules the DAGs both sharded and globally and reports the makespan, unfairness
+    and wall time of each. Slowdowns are against the standalone schedule on all cores
+    in both cases. The global DAGs come with their standalone schedules, while the
+    sharded time includes ranking and scheduling every DAG alone on its cluster.
+    """
+    graphs_by_dag = {dag_id: dag.tasks for dag_id, dag in dags.items()}
+    report: dict = {"algorithm": algorithm, "clusters": clusters}
+    for mode in ["global", "sharded"]:
+        start = time.perf_counter()
+        if mode == "global":
+            scheduled_tasks = run_algorithm(algorithm, dags, cpus)
+        else:
+            scheduled_tasks = schedule_sharded(algorithm, dags, cpus, clusters, workers)
+        seconds = time.perf_counter() - start
+        schedule_metrics = metrics.evaluate(scheduled_tasks, graphs_by_dag, cpus)
+        report[mode] = {
+            "makespan": schedule_metrics.makespan,
+            "unfairness": schedule_metrics.unfairness,
+            "seconds": seconds,
+        }
+    report["makespan_ratio"] = report["sharded"]["makespan"] / report["global"]["makespan"]
+    report["unfairness_difference"] = (
+        report["sharded"]["unfairness"] - report["global"]["unfairness"]
+    )
+    report["speedup"] = report["global"]["seconds"] / report["sharded"]["seconds"]
+    return report
+
+
+if __name__ == "__main__":
+    from scheduler import generate_dags
+
+    if len(sys.argv) < 6:
+        print("Format should be as follows : method + num_of_tasks + cpu cores + num_of_graphs + clusters [+ seed]")
+        exit(1)
+    generation_method = sys.argv[1]
+    number_of_tasks = int(sys.argv[2])
+    cpu_cores = int(sys.argv[3])
+    num_of_graphs = int(sys.argv[4])
+    clusters = int(sys.argv[5])
+    seed = int(sys.argv[6]) if len(sys.argv) > 6 else None
+    dags = generate_dags(generation_method, number_of_tasks, cpu_cores, num_of_graphs, seed)
+    for algorithm in ALGORITHMS:
+        report = compare_with_global(algorithm, dags, cpu_cores, clusters)
+        for mode in ["global", "sharded"]:
+            print(
+                f"{algorithm} {mode:<8} makespan {report[mode]['makespan']} "
+                f"unfairness {report[mode]['unfairness']:.4f} {report[mode]['seconds']:.3f}s"
+            )
+        print(
+            f"{algorithm} makespan x{report['makespan_ratio']:.3f} "
+            f"unfairness {report['unfairness_difference']:+.4f} speedup x{report['speedup']:.2f}"
+        )
@@ -0,0 +1,255 @@
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from heft import ScheduledTask
+from multi_schedulers import DAG
+import metrics
+
+DISTRIBUTIONS = ["lognormal", "normal", "uniform"]
+PERCENTILES = (50, 95, 99)
+
+
+class ReplayPlan:
+    """
+    A static schedule reduced to what a replay needs, as flat arrays over its tasks.
+    Rows are sorted by planned start time, which is a topological order of both the
+    DAG edges and the task order of every core, so one pass over the rows replays
+    the schedule. Placements and per-core orders are kept, only durations change.
+    No DAG starts before its first planned start: MinMax dispatches one DAG at a time
+    at planned times, and without this bound its DAGs would start as soon as cores free.
+    """
+
+    def __init__(
+        self,
+        scheduled_tasks: dict[int, dict[int, ScheduledTask]],
+        dags: dict[int, DAG],
+        cpus: int,
+    ):
+        rows = sorted(
+            (
+                (scheduled_task.start_time, dag_id, task_id, scheduled_task)
+                for dag_id, schedule in scheduled_tasks.items()
+                for task_id, scheduled_task in schedule.items()
+            ),
+            key=lambda row: row[0],
+        )
+        self.cpus = cpus
+        self.dag_ids = np.fromiter(scheduled_tasks.keys(), dtype=np.int64)
+        dag_index = {dag_id: i for i, dag_id in enumerate(self.dag_ids.tolist())}
+        row_of = {(dag_id, task_id): row for row, (_, dag_id, task_id, _) in enumerate(rows)}
+        self.cpu_ids = np.array([row[3].ran_cpu_id for row in rows], dtype=np.int64)
+        self.dag_indices = np.array([dag_index[row[1]] for row in rows], dtype=np.int64)
+        self.durations = np.array(
+            [row[3].computation_finish_time - row[3].start_time for row in rows], dtype=np.int64
+        )
+        # Planned start of each DAG, never before its release time
+        dispatch_times: dict[int, int] = {}
+        for start_time, dag_id, _, _ in rows:
+            dispatch_times.setdefault(dag_id, start_time)
+        self.dispatch_times = np.array([dispatch_times[row[1]] for row in rows], dtype=np.int64)
+        # Previous task on the same core, -1 for the first one
+        self.core_previous = np.full(len(rows), -1, dtype=np.int64)
+        last_on_core = [-1] * cpus
+        # Parent rows and the planned communication cost of each edge, in CSR form
+        self.parent_offsets = np.zeros(len(rows) + 1, dtype=np.int64)
+        parent_rows: list[int] = []
+        communication_costs: list[int] = []
+        for row, (_, dag_id, task_id, scheduled_task) in enumerate(rows):
+            cpu = scheduled_task.ran_cpu_id
+            self.core_previous[row] = last_on_core[cpu]
+            last_on_core[cpu] = row
+            tasks = dags[dag_id].tasks
+            for parent_id in tasks[task_id].fathers:
+                parent_row = row_of[(dag_id, parent_id)]
+                parent_rows.append(parent_row)
+                communication_costs.append(
+                    tasks[parent_id].communication_cost[task_id][rows[parent_row][3].ran_cpu_id][cpu]
+                )
+            self.parent_offsets[row + 1] = len(parent_rows)
+        self.parent_rows = np.array(parent_rows, dtype=np.int64)
+        self.communication_costs = np.array(communication_costs, dtype=np.int64)
+        # Rows grouped by DAG, for the per-DAG reductions
+        self.dag_order = np.argsort(self.dag_indices, kind="stable")
+        self.dag_offsets = np.searchsorted(
+            self.dag_indices[self.dag_order], np.arange(len(self.dag_ids) + 1)
+        )
+        self.own_makespans = metrics.own_makespans(
+            self.dag_ids, {dag_id: dags[dag_id].tasks for dag_id in scheduled_tasks}, cpus
+        )
+
+    def __len__(self) -> int:
+        return len(self.cpu_ids)
+
+
+def noise_factors(
+    rng: np.random.Generator, shape: tuple[int, ...], noise: float, distribution: str
+) -> np.ndarray:
+    """
+    Multiplicative runtime noise with mean 1 and relative standard deviation noise,
+    never below zero
+    """
+    # Single precision draws are about twice as fast and plenty for noise
+    if distribution == "lognormal":
+        sigma = np.sqrt(np.log1p(noise**2))
+        factors = rng.standard_normal(shape, dtype=np.float32)
+        factors *= sigma
+        factors -= sigma**2 / 2
+        return np.exp(factors, out=factors)
+    if distribution == "normal":
+        factors = rng.standard_normal(shape, dtype=np.float32)
+        factors *= noise
+        factors += 1
+        return np.maximum(factors, 0, out=factors)
+    if distribution == "uniform":
+        # A uniform distribution on [1 - w, 1 + w] has a standard deviation of w / sqrt(3)
+        width = min(noise * np.sqrt(3), 1)
+        factors = rng.random(shape, dtype=np.float32)
+        factors *= 2 * width
+        factors += 1 - width
+        return factors
+    raise ValueError(f"Distribution should be one of : {' - '.join(DISTRIBUTIONS)}")
+
+
+def replay(
+    plan: ReplayPlan,
+    samples: int,
+    noise: float,
+    distribution: str,
+    seed: np.random.SeedSequence,
+    communication_noise: bool = True,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Replays the plan under samples perturbations at once and returns the makespan of
+    every sample (samples) and the makespan of every DAG in every sample (samples x dags).
+    A task starts once its DAG is dispatched, its core finished the previous task
+    (intervals are closed, so one time step later) and the data of every parent arrived.
+    """
+    rng = np.random.default_rng(seed)
+    durations = plan.durations[:, None] * noise_factors(
+        rng, (len(plan), samples), noise, distribution
+    )
+    communication_costs = plan.communication_costs[:, None] * (
+        noise_factors(rng, (len(plan.communication_costs), samples), noise, distribution)
+        if communication_noise
+        else 1
+    )
+    starts = np.empty((len(plan), samples))
+    finishes = np.empty((len(plan), samples))
+    for row in range(len(plan)):
+        ready = np.full(samples, float(plan.dispatch_times[row]))
+        previous = plan.core_previous[row]
+        if previous != -1:
+            np.maximum(ready, finishes[previous] + 1, out=ready)
+        first, last = plan.parent_offsets[row], plan.parent_offsets[row + 1]
+        if first != last:
+            arrivals = finishes[plan.parent_rows[first:last]] + communication_costs[first:last]
+            np.maximum(ready, arrivals.max(axis=0), out=ready)
+        starts[row] = ready
+        finishes[row] = ready + durations[row]
+    first_rows = plan.dag_offsets[:-1]
+    dag_makespans = (
+        np.maximum.reduceat(finishes[plan.dag_order], first_rows, axis=0)
+        - np.minimum.reduceat(starts[plan.dag_order], first_rows, axis=0)
+    ).T
+    makespans = finishes.max(axis=0) - starts.min(axis=0)
+    return makespans, dag_makespans
+
+
+class SimulationResult:
+    """
+    Makespan, per-DAG slowdown and unfairness of every sample, with the same
+    definitions as metrics.ScheduleMetrics
+    """
+
+    def __init__(
+        self, dag_ids: np.ndarray, makespans: np.ndarray, dag_makespans: np.ndarray,
+        own_makespans: np.ndarray,
+    ):
+        self.dag_ids = dag_ids
+        self.makespans = makespans
+        self.dag_makespans = dag_makespans
+        # samples x dags
+        self.slowdowns = own_makespans / dag_makespans
+        self.average_slowdowns = self.slowdowns.mean(axis=1)
+        self.unfairnesses = np.abs(self.slowdowns - self.average_slowdowns[:, None]).sum(axis=1)
+
+    def percentiles(self, q: tuple[int, ...] = PERCENTILES) -> dict:
+        """
+        Percentiles of the makespan, average slowdown and unfairness, and of the
+        slowdown of each DAG (dag_id -> values)
+        """
+        return {
+            "makespan": np.percentile(self.makespans, q).tolist(),
+            "average_slowdown": np.percentile(self.average_slowdowns, q).tolist(),
+            "unfairness": np.percentile(self.unfairnesses, q).tolist(),
+            "slowdown": dict(
+                zip(self.dag_ids.tolist(), np.percentile(self.slowdowns, q, axis=0).T.tolist())
+            ),
+        }
+
+
+def simulate(
+    scheduled_tasks: dict[int, dict[int, ScheduledTask]],
+    dags: dict[int, DAG],
+    cpus: int,
+    samples: int = 1000,
+    noise: float = 0.1,
+    distribution: str = "lognormal",
+    seed: int | None = None,
+    communication_noise: bool = True,
+    batch_size: int = 256,
+    workers: int | None = 1,
+) -> SimulationResult:
+    """
+    Monte Carlo replay of a MinMax / FDWS / Rank-Hybrid schedule (a single HEFT schedule
+    is {0: schedule} with {0: DAG(0, graph, cpus, 0)}).
+    Samples are replayed batch_size at a time, each batch with its own child seed, so
+    the results only depend on the seed and not on the number of workers.
+    """
+    if distribution not in DISTRIBUTIONS:
+        raise ValueError(f"Distribution should be one of : {' - '.join(DISTRIBUTIONS)}")
+    plan = ReplayPlan(scheduled_tasks, dags, cpus)
+    batch_sizes = [min(batch_size, samples - first) for first in range(0, samples, batch_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(batch_sizes))
+    arguments = [
+        (plan, size, noise, distribution, batch_seed, communication_noise)
+        for size, batch_seed in zip(batch_sizes, seeds)
+    ]
+    if workers == 1:
+        batches = [replay(*batch_arguments) for batch_arguments in arguments]
+    else:
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+            batches = list(executor.map(replay, *zip(*arguments)))
+    return SimulationResult(
+        plan.dag_ids,
+        np.concatenate([makespans for makespans, _ in batches]),
+        np.concatenate([dag_makespans for _, dag_makespans in batches]),
+        plan.own_makespans,
+    )
+
+
+if __name__ == "__main__":
+    from scheduler import ALGORITHMS, generate_dags, run_algorithm
+
+    if len(sys.argv) < 5:
+        print("Format should be as follows : method + num_of_tasks + cpu cores + num_of_graphs [+ samples + noise + seed]")
+        exit(1)
+    generation_method = sys.argv[1]
+    number_of_tasks = int(sys.argv[2])
+    cpu_cores = int(sys.argv[3])
+    num_of_graphs = int(sys.argv[4])
+    samples = int(sys.argv[5]) if len(sys.argv) > 5 else 1000
+    noise = float(sys.argv[6]) if len(sys.argv) > 6 else 0.1
+    seed = int(sys.argv[7]) if len(sys.argv) > 7 else None
+    dags = generate_dags(generation_method, number_of_tasks, cpu_cores, num_of_graphs, seed)
+    for algorithm in ALGORITHMS:
+        result = simulate(
+            run_algorithm(algorithm, dags, cpu_cores), dags, cpu_cores, samples, noise, seed=seed
+        )
+        summary = result.percentiles()
+        print(algorithm)
+        for metric in ["makespan", "average_slowdown", "unfairness"]:
+            print(f"  {metric:<17} " + " ".join(
+                f"p{q}={value:.4g}" for q, value in zip(PERCENTILES, summary[metric])
+            ))
@@ -0,0 +1,199 @@
+import asyncio
+import heapq
+from typing import AsyncIterator, Iterable, Iterator
+from heft import ProcessorTimelines, ScheduledTask, StandaloneHEFT
+from multi_schedulers import DAG, FDWS_RANK_HYBRID, ReadyQueue
+from task_generator import CompactGraph
+
+POLICIES = ["MinMax", "fdws", "rank_hybd"]
+
+
+class StreamingScheduler:
+    """
+    Online version of MinMax, FDWS and Rank-Hybrid: DAGs are submitted as they arrive,
+    and advance(t) makes every scheduling decision due until time t.
+    With every DAG submitted up front, advance to infinity gives the same placements
+    as the batch schedulers.
+    State is only kept for DAGs in flight; a DAG is dropped once all its tasks completed.
+    """
+
+    def __init__(self, cpus: int, policy: str):
+        if policy not in POLICIES:
+            raise ValueError(f"Policy should be one of : {' - '.join(POLICIES)}")
+        self.cpus = cpus
+        self.policy = policy
+        # Decision time of the scheduler, nothing before it can change anymore
+        self.current_time = 0
+        self.submitted_count = 0
+        # Submitted DAGs which are not released yet as (arrival, order, dag_id)
+        self.waiting_dags: list[tuple[int, int, int]] = []
+        # dag_id -> dag, arrival time and placed tasks of every DAG in flight
+        self.dags: dict[int, DAG] = {}
+        self.arrivals: dict[int, int] = {}
+        self.scheduled_tasks: dict[int, dict[int, ScheduledTask]] = {}
+        # dag_id -> tasks which did not complete yet
+        self.unfinished_tasks: dict[int, int] = {}
+        # Placed tasks by finish time as (finish, order, dag_id, task)
+        self.running_tasks: list[tuple[int, int, int, ScheduledTask]] = []
+        self.placed_count = 0
+        # MinMax: released DAGs as (lowerbound, order, dag_id)
+        self.runnable_dags: list[tuple[int, int, int]] = []
+        # FDWS and Rank-Hybrid
+        self.timelines = ProcessorTimelines(cpus)
+        self.ready_queue = ReadyQueue(highest_rank_first=policy == "fdws")
+
+    def submit(self, dag: DAG):
+        """
+        Adds an arriving DAG. A DAG released before the current decision time is
+        treated as arriving right now.
+        """
+        arrival = max(dag.release_time, self.current_time)
+        self.dags[dag.id] = dag
+        self.arrivals[dag.id] = arrival
+        self.scheduled_tasks[dag.id] = {}
+        self.unfinished_tasks[dag.id] = len(dag.tasks)
+        heapq.heappush(self.waiting_dags, (arrival, self.submitted_count, dag.id))
+        self.submitted_count += 1
+
+    def advance(self, until: float) -> list[tuple[int, ScheduledTask]]:
+        """
+        Makes every decision due until the given time and returns the new placements as
+        (dag_id, task). Every DAG arriving until then should already be submitted.
+        """
+        if self.policy == "MinMax":
+            placements = self.advance_min_max(until)
+        else:
+            placements = self.advance_fdws_rank_hybrid(until)
+        for dag_id, scheduled_task in placements:
+            heapq.heappush(
+                self.running_tasks,
+                (scheduled_task.computation_finish_time, self.placed_count, dag_id, scheduled_task),
+            )
+            self.placed_count += 1
+        return placements
+
+    def release_until(self, time: int) -> list[tuple[int, int]]:
+        released: list[tuple[int, int]] = []
+        while len(self.waiting_dags) != 0 and self.waiting_dags[0][0] <= time:
+            _, order, dag_id = heapq.heappop(self.waiting_dags)
+            released.append((order, dag_id))
+        return released
+
+    def advance_min_max(self, until: float) -> list[tuple[int, ScheduledTask]]:
+        # Same steps as MinMax.schedule, stopping at the first decision after until
+        placements: list[tuple[int, ScheduledTask]] = []
+        while len(self.waiting_dags) != 0 or len(self.runnable_dags) != 0:
+            decision_time = self.current_time + 1
+            if len(self.runnable_dags) == 0:
+                decision_time = max(decision_time, self.waiting_dags[0][0])
+            if decision_time > until:
+                break
+            self.current_time = decision_time
+            for order, dag_id in self.release_until(self.current_time):
+                heapq.heappush(
+                    self.runnable_dags, (self.dags[dag_id].lowerbound, order, dag_id)
+                )
+            _, _, dag_id = heapq.heappop(self.runnable_dags)
+            dag = self.dags[dag_id]
+            standalone = StandaloneHEFT.result(dag.tasks, self.cpus, dag.fingerprint)
+            for task_id, scheduled_task in standalone.schedule.items():
+                shifted_task = scheduled_task.shifted(self.current_time)
+                self.scheduled_tasks[dag_id][task_id] = shifted_task
+                placements.append((dag_id, shifted_task))
+            self.current_time += standalone.makespan
+        return placements
+
+    def advance_fdws_rank_hybrid(self, until: float) -> list[tuple[int, ScheduledTask]]:
+        # Same rounds as FDWS_RANK_HYBRID.schedule, stopping at the first round after until
+        placements: list[tuple[int, ScheduledTask]] = []
+        while len(self.waiting_dags) != 0 or len(self.ready_queue) != 0:
+            decision_time = self.timelines.latest_finish_time
+            if len(self.ready_queue) == 0:
+                decision_time = max(decision_time, self.waiting_dags[0][0])
+            if decision_time > until:
+                break
+            self.current_time = decision_time
+            for order, dag_id in self.release_until(self.current_time):
+                self.ready_queue.release(self.dags[dag_id], order, self.arrivals[dag_id])
+            for dag_id, task in self.ready_queue.pop_all():
+                dag = self.dags[dag_id]
+                scheduled_task = FDWS_RANK_HYBRID.place_task(
+                    task, dag.tasks, self.scheduled_tasks[dag_id], self.arrivals[dag_id], self.timelines
+                )
+                self.scheduled_tasks[dag_id][task.id] = scheduled_task
+                placements.append((dag_id, scheduled_task))
+                self.ready_queue.mark_scheduled(dag, task)
+                if self.ready_queue.is_dag_done(dag_id):
+                    self.ready_queue.forget(dag_id)
+        # No task can become ready before the oldest arrival still in flight, nor can a
+        # DAG submitted from now on arrive before the current time
+        self.timelines.prune(min([self.current_time, *self.arrivals.values()]))
+        return placements
+
+    def completed(self, now: float) -> list[tuple[int, ScheduledTask]]:
+        """
+        Returns the placed tasks finished by now (each one once) as (dag_id, task) and
+        drops the DAGs which have no work left
+        """
+        finished: list[tuple[int, ScheduledTask]] = []
+        while len(self.running_tasks) != 0 and self.running_tasks[0][0] <= now:
+            _, _, dag_id, scheduled_task = heapq.heappop(self.running_tasks)
+            finished.append((dag_id, scheduled_task))
+            self.unfinished_tasks[dag_id] -= 1
+            if self.unfinished_tasks[dag_id] == 0:
+                self.drop(dag_id)
+        return finished
+
+    def drop(self, dag_id: int):
+        dag = self.dags.pop(dag_id)
+        del self.arrivals[dag_id]
+        del self.scheduled_tasks[dag_id]
+        del self.unfinished_tasks[dag_id]
+        StandaloneHEFT.forget(dag.tasks, self.cpus, dag.fingerprint)
+
+    def in_flight(self) -> int:
+        return len(self.dags)
+
+
+def dag_arrivals(
+    graphs: Iterable[tuple[int, CompactGraph]], cpus: int
+) -> Iterator[DAG]:
+    """
+    Lazily turns (release time, graph) pairs, e.g. from generate_tasks.stream, into DAGs
+    """
+    for i, (release_time, graph) in enumerate(graphs):
+        yield DAG(i, graph, cpus, release_time)
+
+
+def stream(
+    scheduler: StreamingScheduler, arrivals: Iterable[DAG]
+) -> Iterator[tuple[list[tuple[int, ScheduledTask]], list[tuple[int, ScheduledTask]]]]:
+    """
+    Feeds DAGs from an iterable (in release time order) and yields the placements
+    decided before each arrival with the tasks completed by then, then the rest once
+    the arrivals run out. Finished DAGs are dropped on the way, so the scheduler only
+    holds the DAGs in flight and is empty at the end.
+    """
+    for dag in arrivals:
+        placements = scheduler.advance(dag.release_time - 1)
+        yield placements, scheduler.completed(dag.release_time)
+        scheduler.submit(dag)
+    placements = scheduler.advance(float("inf"))
+    yield placements, scheduler.completed(float("inf"))
+
+
+async def stream_async(
+    scheduler: StreamingScheduler, arrivals: "asyncio.Queue[DAG | None]"
+) -> AsyncIterator[tuple[list[tuple[int, ScheduledTask]], list[tuple[int, ScheduledTask]]]]:
+    """
+    Same as stream, reading arrivals from an asyncio queue until None is received
+    """
+    while True:
+        dag = await arrivals.get()
+        if dag is None:
+            break
+        placements = scheduler.advance(dag.release_time - 1)
+        yield placements, scheduler.completed(dag.release_time)
+        scheduler.submit(dag)
+    placements = scheduler.advance(float("inf"))
+    yield placements, scheduler.completed(float("inf"))
@@ -1,14 +1,19 @@
 import sys
+import hashlib
 from pprint import pprint
 import math
-from typing import Iterator
-import networkx as nx
-import matplotlib.pyplot as plt
+from typing import Callable, Iterator
+import itertools
 import random
+from collections.abc import Mapping
 import numpy as np
+from instrumentation import STATS
+from communication import DenseCommunication, VolumeCommunication
 
 
 class Task:
+    __slots__ = ("id", "fathers", "children", "communication_cost", "computation_times")
+
     def __init__(self, id: int):
         self.id = id
         self.fathers: list[int] = []
@@ -63,16 +68,401 @@ class Task:
         )
 
 
+class CommunicationCostView(Mapping):
+    """
+    child-id -> cpus x cpus communication cost matrix of one task inside a CompactGraph
+    """
+
+    __slots__ = ("graph", "index")
+
+    def __init__(self, graph: "CompactGraph", index: int):
+        self.graph = graph
+        self.index = index
+
+    def __getitem__(self, child_id: int) -> np.ndarray:
+        return self.graph.communication.matrix(self.graph.edge_index(self.index, child_id))
+
+    def __iter__(self):
+        return iter(self.graph.children_of(self.index))
+
+    def __len__(self) -> int:
+        return int(
+            self.graph.child_offsets[self.index + 1] - self.graph.child_offsets[self.index]
+        )
+
+
+class TaskView:
+    """
+    Read only Task which points into the arrays of a CompactGraph instead of owning lists
+    """
+
+    __slots__ = ("graph", "index")
+
+    def __init__(self, graph: "CompactGraph", index: int):
+        self.graph = graph
+        self.index = index
+
+    @property
+    def id(self) -> int:
+        return self.index + 1
+
+    @property
+    def fathers(self) -> list[int]:
+        return self.graph.parents_of(self.index)
+
+    @property
+    def children(self) -> list[int]:
+        return self.graph.children_of(self.index)
+
+    @property
+    def computation_times(self) -> np.ndarray:
+        return self.graph.computation_times[self.index]
+
+    @property
+    def communication_cost(self) -> CommunicationCostView:
+        return CommunicationCostView(self.graph, self.index)
+
+    def average_communication(self, j: int) -> float:
+        costs = self.communication_cost[j]
+        return costs.sum() / (costs != 0).sum()
+
+    def average_computation(self) -> float:
+        return float(self.computation_times.mean())
+
+    def are_all_parents_are_done(self, done_tasks: set[int]) -> bool:
+        return all(map(lambda father: father in done_tasks, self.fathers))
+
+    def __repr__(self) -> str:
+        return str(
+            {
+                "id": self.id,
+                "parents": self.fathers,
+                "children": self.children,
+                "communication_cost": {
+                    child_id: costs.tolist()
+                    for child_id, costs in self.communication_cost.items()
+                },
+                "computation_times": self.computation_times.tolist(),
+            }
+        )
+
+
+class GraphTopology:
+    """
+    Structure of a CompactGraph: parents and children in CSR form (offsets + indices).
+    It is never modified, so graphs of the same shape share one topology and only own
+    their costs. Whatever only depends on the structure (neighbour lists, parent edges,
+    ranking order, content hash) is computed once per topology, on first use.
+    """
+
+    def __init__(
+        self,
+        parent_offsets: np.ndarray,
+        parent_indices: np.ndarray,
+        child_offsets: np.ndarray,
+        child_indices: np.ndarray,
+    ):
+        self.parent_offsets = parent_offsets
+        self.parent_indices = parent_indices
+        self.child_offsets = child_offsets
+        self.child_indices = child_indices
+        for array in (parent_offsets, parent_indices, child_offsets, child_indices):
+            array.flags.writeable = False
+        self.task_count = len(child_offsets) - 1
+        self.parent_lists: list[list[int]] | None = None
+        self.child_lists: list[list[int]] | None = None
+        self.parent_edge_ids: np.ndarray | None = None
+        # Filled by HEFT.ranking_order
+        self.rank_order: list[int] | None = None
+        self.digest: bytes | None = None
+
+    def __len__(self) -> int:
+        return self.task_count
+
+    def parents(self) -> list[list[int]]:
+        """
+        Parent ids of every task, by index. Shared by every graph, never modify them.
+        """
+        if self.parent_lists is None:
+            self.parent_lists = [
+                ids.tolist()
+                for ids in np.split(self.parent_indices + 1, self.parent_offsets[1:-1])
+            ]
+        return self.parent_lists
+
+    def children(self) -> list[list[int]]:
+        """
+        Child ids of every task, by index. Shared by every graph, never modify them.
+        """
+        if self.child_lists is None:
+            self.child_lists = [
+                ids.tolist()
+                for ids in np.split(self.child_indices + 1, self.child_offsets[1:-1])
+            ]
+        return self.child_lists
+
+    def parent_edges(self) -> np.ndarray:
+        """
+        Edge of every entry of parent_indices
+        """
+        if self.parent_edge_ids is None:
+            # Edges are numbered in child order, match every (parent, child) pair to one
+            task_count = len(self)
+            fathers = np.repeat(np.arange(task_count), np.diff(self.child_offsets))
+            edge_keys = fathers * task_count + self.child_indices
+            children = np.repeat(np.arange(task_count), np.diff(self.parent_offsets))
+            parent_keys = self.parent_indices.astype(np.int64) * task_count + children
+            order = np.argsort(edge_keys, kind="stable")
+            self.parent_edge_ids = order[
+                np.searchsorted(edge_keys, parent_keys, sorter=order)
+            ]
+        return self.parent_edge_ids
+
+    def fingerprint(self) -> bytes:
+        if self.digest is None:
+            digest = hashlib.blake2b(digest_size=16)
+            for array in (
+                self.parent_offsets,
+                self.parent_indices,
+                self.child_offsets,
+                self.child_indices,
+            ):
+                digest.update(str(array.shape).encode())
+                digest.update(array.tobytes())
+            self.digest = digest.digest()
+        return self.digest
+
+
+class CompactGraph(Mapping):
+    """
+    Array backed replacement for dict[int, Task].
+    Task ids are 1..n, task i lives at index i - 1 of every array.
+    The structure is a GraphTopology, possibly shared with other graphs. The graph owns
+    the computation times as a tasks x cpus matrix and the communication costs in a
+    model from communication.py (a dense edges x cpus x cpus tensor by default), where
+    edge e is the e-th entry of child_indices.
+    Indexing the graph gives TaskView objects, so HEFT and the multi DAG schedulers can
+    use it just like a dict[int, Task].
+    """
+
+    def __init__(
+        self,
+        topology: GraphTopology,
+        computation_times: np.ndarray,
+        communication: DenseCommunication | VolumeCommunication | np.ndarray,
+    ):
+        self.topology = topology
+        self.computation_times = computation_times
+        # A plain edges x cpus x cpus array is the dense model
+        if isinstance(communication, np.ndarray):
+            communication = DenseCommunication(communication)
+        self.communication = communication
+
+    @staticmethod
+    def from_edges(
+        task_count: int, edges: list[tuple[int, int]], cpu_count: int = 0
+    ) -> "CompactGraph":
+        """
+        Builds a graph from (father index, child index) pairs. Children keep the order
+        of the pairs, costs are left zero.
+        """
+        edge_array = np.array(edges, dtype=np.int64).reshape(-1, 2)
+        # Stable sort keeps the order in which children were added to each father
+        by_father = np.argsort(edge_array[:, 0], kind="stable")
+        by_child = np.argsort(edge_array[:, 1], kind="stable")
+        child_offsets = np.zeros(task_count + 1, dtype=np.int64)
+        np.cumsum(np.bincount(edge_array[:, 0], minlength=task_count), out=child_offsets[1:])
+        parent_offsets = np.zeros(task_count + 1, dtype=np.int64)
+        np.cumsum(np.bincount(edge_array[:, 1], minlength=task_count), out=parent_offsets[1:])
+        topology = GraphTopology(
+            parent_offsets,
+            edge_array[by_child, 0].astype(np.int32),
+            child_offsets,
+            edge_array[by_father, 1].astype(np.int32),
+        )
+        return CompactGraph.from_topology(topology, cpu_count)
+
+    @staticmethod
+    def from_topology(topology: GraphTopology, cpu_count: int = 0) -> "CompactGraph":
+        """
+        New graph on an existing topology, costs are left zero
+        """
+        return CompactGraph(
+            topology,
+            np.zeros((len(topology), cpu_count), dtype=np.int32),
+            np.zeros(
+                (len(topology.child_indices), cpu_count, cpu_count), dtype=np.int32
+            ),
+        )
+
+    @staticmethod
+    def from_tasks(tasks: dict[int, Task]) -> "CompactGraph":
+        """
+        Packs a dict[int, Task] (with ids 1..n) into arrays, costs included
+        """
+        task_count = len(tasks)
+        edges: list[tuple[int, int]] = []
+        fathers: list[tuple[int, int]] = []
+        for id in range(1, task_count + 1):
+            edges.extend((id - 1, child_id - 1) for child_id in tasks[id].children)
+            fathers.extend((father_id - 1, id - 1) for father_id in tasks[id].fathers)
+        cpu_count = len(tasks[1].computation_times) if task_count != 0 else 0
+        graph = CompactGraph.from_edges(task_count, edges, cpu_count)
+        # Parents keep their own order too, it is not always the order of the edges
+        graph.topology = GraphTopology(
+            graph.parent_offsets,
+            np.array([father for father, _ in fathers], dtype=np.int32),
+            graph.child_offsets,
+            graph.child_indices,
+        )
+        if cpu_count != 0:
+            graph.computation_times[:] = [
+                tasks[id].computation_times for id in range(1, task_count + 1)
+            ]
+            costs = graph.communication.costs
+            for edge, (father, child) in enumerate(edges):
+                costs[edge] = tasks[father + 1].communication_cost[
+                    child + 1
+                ]
+        return graph
+
+    def to_tasks(self) -> dict[int, Task]:
+        tasks: dict[int, Task] = {}
+        for view in self.values():
+            task = Task(view.id)
+            task.fathers = view.fathers
+            task.children = view.children
+            task.computation_times = view.computation_times.tolist()
+            task.communication_cost = {
+                child_id: costs.tolist()
+                for child_id, costs in view.communication_cost.items()
+            }
+            tasks[task.id] = task
+        return tasks
+
+    @property
+    def communication_costs(self) -> np.ndarray:
+        """
+        Costs as the dense edges x cpus x cpus tensor, whatever the model
+        """
+        return self.communication.dense()
+
+    @communication_costs.setter
+    def communication_costs(self, costs: np.ndarray):
+        self.communication = DenseCommunication(costs)
+
+    # Costs are replaced through these setters, never modified in place once a graph was
+    # scheduled, so they also drop what was derived from the old costs
+    @property
+    def communication(self) -> DenseCommunication | VolumeCommunication:
+        return self.communication_model
+
+    @communication.setter
+    def communication(self, communication: DenseCommunication | VolumeCommunication):
+        self.communication_model = communication
+        self.digest: str | None = None
+
+    @property
+    def cpu_count(self) -> int:
+        return self.computation_times.shape[1]
+
+    @property
+    def computation_times(self) -> np.ndarray:
+        return self.computation_array
+
+    @computation_times.setter
+    def computation_times(self, computation_times: np.ndarray):
+        self.computation_array = computation_times
+        self.computation_lists: list[list[int]] | None = None
+        self.digest = None
+
+    def computation_rows(self) -> list[list[int]]:
+        """
+        Computation times as lists, built once for the per task loops of the schedulers
+        """
+        if self.computation_lists is None:
+            self.computation_lists = self.computation_array.tolist()
+        return self.computation_lists
+
+    @property
+    def parent_offsets(self) -> np.ndarray:
+        return self.topology.parent_offsets
+
+    @property
+    def parent_indices(self) -> np.ndarray:
+        return self.topology.parent_indices
+
+    @property
+    def child_offsets(self) -> np.ndarray:
+        return self.topology.child_offsets
+
+    @property
+    def child_indices(self) -> np.ndarray:
+        return self.topology.child_indices
+
+    def parents_of(self, index: int) -> list[int]:
+        return self.topology.parents()[index]
+
+    def children_of(self, index: int) -> list[int]:
+        return self.topology.children()[index]
+
+    def parent_edges(self, index: int) -> tuple[list[int], np.ndarray]:
+        """
+        Parent ids of a task and the edge (index into the communication model) from each one
+        """
+        start, end = self.parent_offsets[index], self.parent_offsets[index + 1]
+        return self.parents_of(index), self.topology.parent_edges()[start:end]
+
+    def edge_index(self, index: int, child_id: int) -> int:
+        start = int(self.child_offsets[index])
+        return start + self.children_of(index).index(child_id)
+
+    def mean_costs(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Same as HEFT.mean_costs, straight from the arrays
+        """
+        average_computations = self.computation_times.mean(axis=1)
+        if len(self.communication) == 0:
+            return average_computations, self.child_offsets, np.zeros(0)
+        return average_computations, self.child_offsets, self.communication.means()
+
+    def __getitem__(self, id: int) -> TaskView:
+        if not 1 <= id <= self.topology.task_count:
+            raise KeyError(id)
+        return TaskView(self, id - 1)
+
+    def __iter__(self):
+        return iter(range(1, len(self) + 1))
+
+    def __len__(self) -> int:
+        return self.topology.task_count
+
+    def __deepcopy__(self, memo) -> "CompactGraph":
+        # The structure is never changed after construction, only costs are worth copying
+        return CompactGraph(
+            self.topology,
+            self.computation_times.copy(),
+            self.communication.copy(),
+        )
+
+    def __repr__(self) -> str:
+        return repr(dict(self.items()))
+
+
 class generate_tasks:
+    # (method, size) -> topology shared by every FFT / GE graph of that size
+    topologies: dict[tuple[str, int], GraphTopology] = {}
     # Fast Fourier Transform DAG generation
     @staticmethod
-    def FFT(m: int) -> dict[int, Task]:
+    def FFT(m: int, compact: bool = False) -> dict[int, Task] | CompactGraph:
         total_graph_nodes = int(m * math.log2(m) + 2 * m - 1)
         all_nodes: dict[int, Task] = {}
         for node in range(1, total_graph_nodes + 1):
             all_nodes[node] = Task(node)
 
-        for i in range(1, m - 1):
+        # The recursive calls form a tree of log2(m) levels. The bound used to be m - 1,
+        # which ran past the last node for every m above 5
+        for i in range(1, min(m - 1, math.ceil(math.log2(m)) + 1)):
             for j in range(2 ** (i - 1), 2 ** (i)):
                 for k in range(j * 2, j * 2 + 2):
                     all_nodes[j].children.append(k)
@@ -98,11 +488,13 @@ class generate_tasks:
                     )
             base_pointer += m
 
+        if compact:
+            return CompactGraph.from_tasks(all_nodes)
         return all_nodes
 
     # Gaussian Elimination DAG generation
     @staticmethod
-    def GE(m: int) -> dict[int, Task]:
+    def GE(m: int, compact: bool = False) -> dict[int, Task] | CompactGraph:
         total_graph_nodes = int((m * m + m - 2) / 2)
         all_nodes: dict[int, Task] = {}
         for node in range(1, total_graph_nodes + 1):
@@ -123,8 +515,245 @@ class generate_tasks:
             base_pointer += m
             m -= 1
 
+        if compact:
+            return CompactGraph.from_tasks(all_nodes)
         return all_nodes
     
+    @staticmethod
+    def shared_topology(method: str, m: int) -> GraphTopology:
+        """
+        The FFT or GE structure of size m, built once per process
+        """
+        if (method, m) not in generate_tasks.topologies:
+            if method not in ["FFT", "GE"]:
+                raise ValueError("Method should be : FFT - GE")
+            generator = generate_tasks.GE if method == "GE" else generate_tasks.FFT
+            generate_tasks.topologies[(method, m)] = generator(m, compact=True).topology
+        return generate_tasks.topologies[(method, m)]
+
+    @staticmethod
+    def instances(method: str, m: int, count: int) -> list[CompactGraph]:
+        """
+        count FFT or GE graphs of size m on one shared topology, each with its own zero
+        costs to fill with populate_costs_batch
+        """
+        topology = generate_tasks.shared_topology(method, m)
+        return [CompactGraph.from_topology(topology) for _ in range(count)]
+
+    # The generators below build CompactGraphs straight from edge arrays, without any
+    # per task Python work, so they scale to millions of tasks. Costs are left zero,
+    # fill them with populate_costs. seed can also be a numpy Generator to share one.
+
+    # Random layered DAG: depth layers of width tasks, every task but the last layer's
+    # gets fan_out distinct children in the next layer
+    @staticmethod
+    def layered(
+        width: int, depth: int, fan_out: int, seed: int | np.random.Generator | None = None
+    ) -> CompactGraph:
+        rng = np.random.default_rng(seed)
+        fan_out = min(fan_out, width)
+        task_count = width * depth
+        father_count = task_count - width
+        if father_count <= 0 or fan_out < 1:
+            return CompactGraph.from_edges(task_count, [])
+        fathers = np.repeat(np.arange(father_count), fan_out)
+        layers = fathers // width
+        # Each father takes a window of consecutive tasks in a random order of the next
+        # layer, so its children are distinct without any rejection sampling
+        orders = rng.permuted(np.tile(np.arange(width), (depth - 1, 1)), axis=1)
+        window_starts = np.repeat(rng.integers(0, width, father_count), fan_out)
+        steps = np.tile(np.arange(fan_out), father_count)
+        children = (layers + 1) * width + orders[layers, (window_starts + steps) % width]
+        # Tasks no window covered get one random father in the layer above
+        orphans = np.flatnonzero(np.bincount(children, minlength=task_count)[width:] == 0) + width
+        orphan_fathers = (orphans // width - 1) * width + rng.integers(0, width, len(orphans))
+        edges = np.concatenate(
+            [np.stack([fathers, children], axis=1), np.stack([orphan_fathers, orphans], axis=1)]
+        )
+        return CompactGraph.from_edges(task_count, edges)
+
+    # stages fork-join blocks in a row: a fork task, width parallel tasks and a join task,
+    # which is the fork of the next block
+    @staticmethod
+    def fork_join(width: int, stages: int) -> CompactGraph:
+        block = width + 1
+        forks = np.arange(stages) * block
+        branches = (forks[:, None] + 1 + np.arange(width)).ravel()
+        edges = np.concatenate(
+            [
+                np.stack([np.repeat(forks, width), branches], axis=1),
+                np.stack([branches, np.repeat(forks + block, width)], axis=1),
+            ]
+        )
+        return CompactGraph.from_edges(stages * block + 1, edges)
+
+    # Montage (astronomical mosaic) workflow shape: width projections, a difference fit
+    # for each pair of neighbouring projections, one fit concatenation and background
+    # model, width background corrections, then a chain of table, add, shrink and jpeg
+    @staticmethod
+    def montage(width: int) -> CompactGraph:
+        if width < 2:
+            raise ValueError("Montage needs at least 2 projections")
+        projects = np.arange(width)
+        diffs = width + np.arange(width - 1)
+        concat = 2 * width - 1
+        background_model = concat + 1
+        backgrounds = background_model + 1 + projects
+        table = backgrounds[-1] + 1
+        edges = np.concatenate(
+            [
+                np.stack([projects[:-1], diffs], axis=1),
+                np.stack([projects[1:], diffs], axis=1),
+                np.stack([diffs, np.full(width - 1, concat)], axis=1),
+                [(concat, background_model)],
+                np.stack([np.full(width, background_model), backgrounds], axis=1),
+                np.stack([projects, backgrounds], axis=1),
+                np.stack([backgrounds, np.full(width, table)], axis=1),
+                [(table, table + 1), (table + 1, table + 2), (table + 2, table + 3)],
+            ]
+        )
+        return CompactGraph.from_edges(table + 4, edges)
+
+    # Epigenomics (genome sequencing) workflow shape: every lane splits its reads into
+    # width chains of 4 tasks (filter, convert, convert, map) merged per lane, then a
+    # global merge, index and pileup
+    @staticmethod
+    def epigenomics(lanes: int, width: int) -> CompactGraph:
+        chain_length = 4
+        block = chain_length * width + 2
+        splits = np.arange(lanes) * block
+        # lanes x stages x width
+        chains = (
+            splits[:, None, None]
+            + 1
+            + np.arange(chain_length)[None, :, None] * width
+            + np.arange(width)[None, None, :]
+        )
+        lane_merges = splits + block - 1
+        merge = lanes * block
+        edges = np.concatenate(
+            [
+                np.stack([np.repeat(splits, width), chains[:, 0].ravel()], axis=1),
+                np.stack([chains[:, :-1].ravel(), chains[:, 1:].ravel()], axis=1),
+                np.stack([chains[:, -1].ravel(), np.repeat(lane_merges, width)], axis=1),
+                np.stack([lane_merges, np.full(lanes, merge)], axis=1),
+                [(merge, merge + 1), (merge + 1, merge + 2)],
+            ]
+        )
+        return CompactGraph.from_edges(merge + 3, edges)
+
+    @staticmethod
+    def stream(
+        build: Callable[[np.random.Generator], CompactGraph],
+        cpu_count: int,
+        count: int | None = None,
+        seed: int | None = None,
+        mean_interarrival: float = 50,
+        links: np.ndarray | None = None,
+    ) -> Iterator[tuple[int, CompactGraph]]:
+        """
+        Lazily yields (release time, graph) pairs with their costs filled, for count
+        graphs or forever. build gets the shared generator, e.g.
+        lambda rng: generate_tasks.layered(16, 8, 3, rng). Release times grow by
+        exponentially distributed gaps. links as in populate_costs_batch.
+        """
+        rng = np.random.default_rng(seed)
+        release_time = 0
+        for _ in itertools.count() if count is None else range(count):
+            graph = build(rng)
+            generate_tasks.populate_costs(graph, cpu_count, rng, links)
+            yield release_time, graph
+            release_time += int(rng.exponential(mean_interarrival))
+
+    @staticmethod
+    def random_costs(
+        rng: np.random.Generator, task_count: int, edge_count: int, cpu_count: int
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Draws the same distributions as Task.populate_cpu_dependant_variables, for many
+        tasks and edges at once: a tasks x cpus computation matrix and an
+        edges x cpus x cpus communication tensor
+        """
+        base_times = rng.integers(10, 100, size=(task_count, cpu_count), endpoint=True)
+        jittered_times = np.trunc(rng.normal(base_times, 5)).astype(np.int64)
+        computation_times = np.minimum(np.maximum(1, jittered_times), base_times + 25)
+        communication_costs = rng.integers(
+            5, 25, size=(edge_count, cpu_count, cpu_count), endpoint=True
+        )
+        cpus = np.arange(cpu_count)
+        communication_costs[:, cpus, cpus] = 0
+        return computation_times, communication_costs
+
+    @staticmethod
+    def populate_costs(
+        graph: dict[int, Task] | CompactGraph,
+        cpu_count: int,
+        seed: int | np.random.Generator | None = None,
+        links: np.ndarray | None = None,
+    ):
+        generate_tasks.populate_costs_batch([graph], cpu_count, seed, links)
+
+    @staticmethod
+    @STATS.timed("populate_costs")
+    def populate_costs_batch(
+        graphs: list[dict[int, Task] | CompactGraph],
+        cpu_count: int,
+        seed: int | np.random.Generator | None = None,
+        links: np.ndarray | None = None,
+    ):
+        """
+        Fills the costs of every task of every graph with a couple of numpy calls.
+        The same seed always gives the same costs.
+        Without links every edge gets its own random cpus x cpus matrix. With a
+        cpus x cpus links matrix (see communication.py) every edge only gets a random
+        data volume and costs volume x links, compact graphs then store a
+        VolumeCommunication.
+        """
+        rng = np.random.default_rng(seed)
+        task_counts = [len(graph) for graph in graphs]
+        edge_counts = [
+            len(graph.child_indices)
+            if isinstance(graph, CompactGraph)
+            else sum(len(task.children) for task in graph.values())
+            for graph in graphs
+        ]
+        if links is None:
+            computation_times, communication_costs = generate_tasks.random_costs(
+                rng, sum(task_counts), sum(edge_counts), cpu_count
+            )
+        else:
+            computation_times, _ = generate_tasks.random_costs(rng, sum(task_counts), 0, cpu_count)
+            # Same range as the dense costs, so unit links keep the same scale
+            communication_costs = rng.integers(5, 25, size=sum(edge_counts), endpoint=True)
+        task_offset = 0
+        edge_offset = 0
+        for graph, task_count, edge_count in zip(graphs, task_counts, edge_counts):
+            graph_computation_times = computation_times[task_offset : task_offset + task_count]
+            graph_communication_costs = communication_costs[edge_offset : edge_offset + edge_count]
+            task_offset += task_count
+            edge_offset += edge_count
+            if isinstance(graph, CompactGraph):
+                graph.computation_times = graph_computation_times.astype(np.int32)
+                if links is None:
+                    graph.communication_costs = graph_communication_costs.astype(np.int32)
+                else:
+                    graph.communication = VolumeCommunication(
+                        graph_communication_costs.astype(np.int32), links
+                    )
+                continue
+            edge = 0
+            for id in range(1, task_count + 1):
+                task = graph[id]
+                task.computation_times = graph_computation_times[id - 1].tolist()
+                task.communication_cost = {}
+                for child_id in task.children:
+                    task.communication_cost[child_id] = (
+                        graph_communication_costs[edge]
+                        if links is None
+                        else graph_communication_costs[edge] * links
+                    ).tolist()
+                    edge += 1
+
     @staticmethod
     def merge_tasks(tasks: Iterator[Iterator[Task]]) -> dict[int, Task]:
         result: dict[int, Task] = {}
@@ -144,16 +773,10 @@ class generate_tasks:
 
     @staticmethod
     def draw_graph(graph: dict[int, Task]):
-        G = nx.DiGraph()
-
-        for node, attrs in graph.items():
-            G.add_node(node)
-            for child in attrs.children:
-                G.add_edge(node, child)
+        # Plotting libraries are only loaded by the processes which draw
+        from visualization import draw_graph
 
-        pos = nx.drawing.nx_agraph.graphviz_layout(G, prog="dot")
-        nx.draw(G, pos, with_labels=True, arrows=True)
-        plt.show()
+        draw_graph(graph)
 
 
 if __name__ == "__main__":
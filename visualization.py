@@ -0,0 +1,140 @@
+import numpy as np
+from matplotlib import colormaps
+from matplotlib.collections import PolyCollection
+from matplotlib.figure import Figure
+from matplotlib.patches import Patch
+from heft import ScheduledTask
+from metrics import ScheduleArrays
+from task_generator import Task
+
+# Drawing helpers, kept apart from the schedulers so that importing them never loads
+# matplotlib, networkx or pygraphviz
+
+# Figure width in inches and resolution used for charts
+CHART_WIDTH = 16
+CHART_DPI = 100
+# DAGs are only listed in the legend up to this many
+LEGEND_LIMIT = 20
+
+
+def draw_graph(graph: dict[int, Task]):
+    # Only the graph layout needs networkx and pygraphviz
+    import matplotlib.pyplot as plt
+    import networkx as nx
+
+    G = nx.DiGraph()
+
+    for node, attrs in graph.items():
+        G.add_node(node)
+        for child in attrs.children:
+            G.add_edge(node, child)
+
+    pos = nx.drawing.nx_agraph.graphviz_layout(G, prog="dot")
+    nx.draw(G, pos, with_labels=True, arrows=True)
+    plt.show()
+
+
+def schedule_arrays(
+    tasks: dict[int, ScheduledTask] | dict[int, dict[int, ScheduledTask]],
+) -> ScheduleArrays:
+    # A single schedule is drawn as one DAG. The shape is told apart without the class,
+    # which is __main__.ScheduledTask when heft.py runs as a script
+    if not isinstance(next(iter(tasks.values()), None), dict):
+        tasks = {0: tasks}
+    return ScheduleArrays.from_schedule(tasks)
+
+
+def merged_bars(
+    schedule: ScheduleArrays, resolution: float
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    (cpu, start, finish, dag index) of the bars to draw. Neighbouring tasks of the same
+    DAG on a core are merged into one bar when the idle time between them is at most
+    resolution, so a zoomed out chart draws about one bar per visible run.
+    """
+    dag_indices = np.repeat(np.arange(len(schedule.dag_ids)), np.diff(schedule.dag_offsets))
+    end = int(schedule.finish_times.max())
+    order = np.argsort(schedule.cpu_ids * (end + 1) + schedule.start_times)
+    cpu_ids = schedule.cpu_ids[order]
+    start_times = schedule.start_times[order]
+    finish_times = schedule.finish_times[order]
+    dag_indices = dag_indices[order]
+    new_bar = np.ones(len(order), dtype=bool)
+    new_bar[1:] = (
+        (cpu_ids[1:] != cpu_ids[:-1])
+        | (dag_indices[1:] != dag_indices[:-1])
+        | (start_times[1:] - finish_times[:-1] > resolution)
+    )
+    firsts = np.flatnonzero(new_bar)
+    return (
+        cpu_ids[firsts],
+        start_times[firsts],
+        np.maximum.reduceat(finish_times, firsts),
+        dag_indices[firsts],
+    )
+
+
+def draw_chart(
+    tasks: dict[int, ScheduledTask] | dict[int, dict[int, ScheduledTask]],
+    path: str | None = None,
+    merge: bool = True,
+):
+    """
+    Gantt chart with one lane per core and one colour per DAG, for a single schedule or
+    the dag_id -> schedule output of the multi DAG schedulers.
+    All bars go into a single collection. With merge, bars closer than a pixel are
+    drawn as one. The chart is saved to path without any GUI when given, shown otherwise.
+    """
+    schedule = schedule_arrays(tasks)
+    start = int(schedule.start_times.min())
+    end = int(schedule.finish_times.max())
+    cpus = int(schedule.cpu_ids.max()) + 1
+    # Time covered by one pixel of the chart
+    resolution = max(end - start, 1) / (CHART_WIDTH * CHART_DPI)
+    cpu_ids, start_times, finish_times, dag_indices = merged_bars(
+        schedule, resolution if merge else 0
+    )
+    # Bars are at least a pixel wide, so short tasks do not vanish
+    finish_times = np.maximum(finish_times, start_times + resolution)
+    verts = np.empty((len(cpu_ids), 4, 2))
+    verts[:, 0, 0] = verts[:, 3, 0] = start_times
+    verts[:, 1, 0] = verts[:, 2, 0] = finish_times
+    verts[:, 0, 1] = verts[:, 1, 1] = cpu_ids - 0.4
+    verts[:, 2, 1] = verts[:, 3, 1] = cpu_ids + 0.4
+    colormap = colormaps["tab20"]
+    bars = PolyCollection(
+        verts, facecolors=colormap(dag_indices % colormap.N), edgecolors="none", linewidths=0
+    )
+
+    if path is None:
+        import matplotlib.pyplot as plt
+
+        fig = plt.figure(figsize=(CHART_WIDTH, max(2, 0.3 * cpus + 1)), dpi=CHART_DPI)
+    else:
+        # Drawing on a bare Figure needs no GUI backend
+        fig = Figure(figsize=(CHART_WIDTH, max(2, 0.3 * cpus + 1)), dpi=CHART_DPI)
+    ax = fig.add_subplot(1, 1, 1)
+    ax.add_collection(bars)
+    ax.set_xlim(start, end)
+    ax.set_ylim(-0.5, cpus - 0.5)
+    ax.set_yticks(range(cpus))
+    ax.set_yticklabels([f"cpu {cpu}" for cpu in range(cpus)])
+    ax.invert_yaxis()
+    ax.set_xlabel('Time')
+    ax.set_ylabel('Cores')
+    ax.set_title('Gantt Chart')
+    if 1 < len(schedule.dag_ids) <= LEGEND_LIMIT:
+        ax.legend(
+            handles=[
+                Patch(color=colormap(i % colormap.N), label=f"dag {dag_id}")
+                for i, dag_id in enumerate(schedule.dag_ids.tolist())
+            ],
+            loc="upper left",
+            bbox_to_anchor=(1, 1),
+        )
+    fig.tight_layout()
+
+    if path is None:
+        plt.show()
+    else:
+        fig.savefig(path)
@@ -0,0 +1,209 @@
+import struct
+import numpy as np
+from task_generator import CompactGraph, GraphTopology, Task
+from communication import DenseCommunication, VolumeCommunication
+
+# File layout (little endian):
+#   header: magic, version, cpu count, graph count
+#   index: one (task count, edge count, release time) row of int64 per graph
+#   sections, each aligned to ALIGNMENT bytes and holding every graph back to back:
+#     parent offsets (int64, tasks + 1 per graph), parent indices (int32, edges),
+#     child offsets (int64, tasks + 1 per graph), child indices (int32, edges),
+#     computation times (int32, tasks x cpus), communication costs (int32, edges x cpus x cpus)
+# Version 2 holds VolumeCommunication graphs: the last section becomes the data volumes
+# (int32, edges), followed by the links shared by every graph (int64, cpus x cpus).
+# Offsets are local to each graph, so a graph is just a set of slices of the sections.
+MAGIC = b"FSCWKLD\0"
+DENSE_VERSION = 1
+VOLUME_VERSION = 2
+HEADER = struct.Struct("<8sIIQ")
+ALIGNMENT = 64
+# Release time of graphs saved without one
+NO_RELEASE_TIME = -1
+
+
+class Workload:
+    """
+    Graphs of a workload file plus the release time of each one (None if not saved)
+    """
+
+    def __init__(self, graphs: list[CompactGraph], release_times: list[int | None]):
+        self.graphs = graphs
+        self.release_times = release_times
+
+    def to_dags(self, cpus: int) -> dict:
+        from multi_schedulers import DAG
+
+        return {
+            i: DAG(i, graph, cpus, release_time)
+            for i, (graph, release_time) in enumerate(zip(self.graphs, self.release_times))
+        }
+
+
+def aligned(offset: int) -> int:
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def section_layout(
+    graph_count: int, total_tasks: int, total_edges: int, cpu_count: int,
+    version: int = DENSE_VERSION,
+) -> list[tuple[np.dtype, tuple[int, ...], int]]:
+    """
+    (dtype, shape, file offset) of every section, in file order
+    """
+    shapes = [
+        (np.int64, (total_tasks + graph_count,)),
+        (np.int32, (total_edges,)),
+        (np.int64, (total_tasks + graph_count,)),
+        (np.int32, (total_edges,)),
+        (np.int32, (total_tasks, cpu_count)),
+    ]
+    if version == DENSE_VERSION:
+        shapes.append((np.int32, (total_edges, cpu_count, cpu_count)))
+    else:
+        shapes.extend([(np.int32, (total_edges,)), (np.int64, (cpu_count, cpu_count))])
+    layout = []
+    offset = aligned(HEADER.size + graph_count * 3 * 8)
+    for dtype, shape in shapes:
+        layout.append((np.dtype(dtype), shape, offset))
+        offset = aligned(offset + int(np.prod(shape)) * np.dtype(dtype).itemsize)
+    return layout
+
+
+def save_workload(
+    path: str,
+    graphs: list[dict[int, Task] | CompactGraph],
+    release_times: list[int | None] | None = None,
+):
+    graphs = [
+        graph if isinstance(graph, CompactGraph) else CompactGraph.from_tasks(graph)
+        for graph in graphs
+    ]
+    if release_times is None:
+        release_times = [None] * len(graphs)
+    cpu_count = graphs[0].cpu_count if len(graphs) != 0 else 0
+    if any(graph.cpu_count != cpu_count for graph in graphs):
+        raise ValueError("Every graph of a workload should have the same cpu count")
+    if all(isinstance(graph.communication, DenseCommunication) for graph in graphs):
+        version = DENSE_VERSION
+    elif all(
+        isinstance(graph.communication, VolumeCommunication)
+        and np.array_equal(graph.communication.links, graphs[0].communication.links)
+        for graph in graphs
+    ):
+        version = VOLUME_VERSION
+    else:
+        raise ValueError("Every graph of a workload should be dense or share the same links")
+    index = np.array(
+        [
+            (
+                len(graph),
+                len(graph.child_indices),
+                NO_RELEASE_TIME if release_time is None else release_time,
+            )
+            for graph, release_time in zip(graphs, release_times)
+        ],
+        dtype="<i8",
+    ).reshape(-1, 3)
+    layout = section_layout(
+        len(graphs), int(index[:, 0].sum()), int(index[:, 1].sum()), cpu_count, version
+    )
+    sections = [
+        [graph.parent_offsets for graph in graphs],
+        [graph.parent_indices for graph in graphs],
+        [graph.child_offsets for graph in graphs],
+        [graph.child_indices for graph in graphs],
+        [graph.computation_times for graph in graphs],
+    ]
+    if version == DENSE_VERSION:
+        sections.append([graph.communication.costs for graph in graphs])
+    else:
+        sections.append([graph.communication.volumes for graph in graphs])
+        sections.append([graph.communication.links for graph in graphs[:1]])
+    with open(path, "wb") as file:
+        file.write(HEADER.pack(MAGIC, version, cpu_count, len(graphs)))
+        file.write(index.tobytes())
+        for (dtype, shape, offset), arrays in zip(layout, sections):
+            file.write(b"\0" * (offset - file.tell()))
+            for array in arrays:
+                file.write(np.ascontiguousarray(array, dtype=dtype.newbyteorder("<")).tobytes())
+
+
+def load_workload(path: str) -> Workload:
+    """
+    Memory maps a workload file. The graphs are views into the mapping, nothing is
+    parsed per task, and their arrays are read only until copied.
+    """
+    data = np.memmap(path, dtype=np.uint8, mode="r")
+    magic, version, cpu_count, graph_count = HEADER.unpack_from(data, 0)
+    if magic != MAGIC or version not in (DENSE_VERSION, VOLUME_VERSION):
+        raise ValueError(f"{path} is not a version {DENSE_VERSION} or {VOLUME_VERSION} workload file")
+    index = np.frombuffer(data, dtype="<i8", count=graph_count * 3, offset=HEADER.size)
+    index = index.reshape(graph_count, 3)
+    task_counts, edge_counts = index[:, 0], index[:, 1]
+    layout = section_layout(
+        graph_count, int(task_counts.sum()), int(edge_counts.sum()), cpu_count, version
+    )
+    sections = [
+        np.frombuffer(
+            data, dtype=dtype.newbyteorder("<"), count=int(np.prod(shape)), offset=offset
+        ).reshape(shape)
+        # Empty trailing sections may start past the end of the file
+        if np.prod(shape) != 0
+        else np.zeros(shape, dtype=dtype)
+        for dtype, shape, offset in layout
+    ]
+    graphs: list[CompactGraph] = []
+    task_offset = 0
+    edge_offset = 0
+    for graph_index in range(graph_count):
+        task_count, edge_count = int(task_counts[graph_index]), int(edge_counts[graph_index])
+        # Offset arrays hold one extra entry per graph
+        offsets = slice(task_offset + graph_index, task_offset + graph_index + task_count + 1)
+        tasks = slice(task_offset, task_offset + task_count)
+        edges = slice(edge_offset, edge_offset + edge_count)
+        graphs.append(
+            CompactGraph(
+                GraphTopology(
+                    sections[0][offsets],
+                    sections[1][edges],
+                    sections[2][offsets],
+                    sections[3][edges],
+                ),
+                sections[4][tasks],
+                sections[5][edges]
+                if version == DENSE_VERSION
+                else VolumeCommunication(sections[5][edges], sections[6]),
+            )
+        )
+        task_offset += task_count
+        edge_offset += edge_count
+    release_times = [
+        None if release_time == NO_RELEASE_TIME else int(release_time)
+        for release_time in index[:, 2]
+    ]
+    return Workload(graphs, release_times)
+
+
+if __name__ == "__main__":
+    import sys
+    import random
+    from task_generator import generate_tasks
+
+    if len(sys.argv) < 6:
+        print("Format should be as follows : method + num_of_tasks + cpu cores + num_of_graphs + output file [+ seed]")
+        exit(1)
+    generation_method = sys.argv[1]
+    number_of_tasks = int(sys.argv[2])
+    cpu_cores = int(sys.argv[3])
+    num_of_graphs = int(sys.argv[4])
+    seed = int(sys.argv[6]) if len(sys.argv) > 6 else None
+    if generation_method not in ["GE", "FFT"]:
+        print("Method should be : FFT - GE")
+        exit(1)
+    random.seed(seed)
+    graphs = generate_tasks.instances(generation_method, number_of_tasks, num_of_graphs)
+    generate_tasks.populate_costs_batch(graphs, cpu_cores, seed)
+    # Same arrival distribution as DAG, fixed once so every replay sees the same one
+    save_workload(sys.argv[5], graphs, [random.randint(0, 500) for _ in graphs])
+    print("Saved", sum(map(len, graphs)), "tasks in", num_of_graphs, "graphs to", sys.argv[5])